@@ -1,18 +1,168 @@
-from typing import Optional, Iterable
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Iterable, List, Tuple
+from collections import deque
+import heapq
 
 import numpy as np
+from scipy.sparse import csr_matrix
 from scipy.sparse.csgraph import dijkstra
 
 from botlibs.graph.classes import AdjacencyMatrix, NodesPair
 
 
-class DijkstraAlgorithm:
-    def __init__(self, adjacency_matrix: AdjacencyMatrix):
+NO_PREDECESSOR = -9999
+
+
+def edge_weight(csgraph: csr_matrix, from_node: int, to_node: int) -> float:
+    start, end = csgraph.indptr[from_node], csgraph.indptr[from_node + 1]
+    positions = np.flatnonzero(csgraph.indices[start:end] == to_node)
+    return csgraph.data[start + positions[-1]] if positions.size else np.inf
+
+
+def find_changed_edges(old_csgraph: csr_matrix, new_csgraph: csr_matrix) -> List[Tuple[int, int]]:
+    changes = (old_csgraph != new_csgraph).tocoo()
+    return list(zip(changes.row.tolist(), changes.col.tolist()))
+
+
+def bfs_deque(csgraph: csr_matrix, sources: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+    indptr, indices = csgraph.indptr.tolist(), csgraph.indices.tolist()
+    nodes_number = csgraph.shape[0]
+    dist_rows, predecessors_rows = [], []
+    for source in sources:
+        dist = [np.inf] * nodes_number
+        predecessors = [NO_PREDECESSOR] * nodes_number
+        dist[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            neighbor_distance = dist[node] + 1
+            for k in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[k]
+                if dist[neighbor] == np.inf:
+                    dist[neighbor] = neighbor_distance
+                    predecessors[neighbor] = node
+                    queue.append(neighbor)
+        dist_rows.append(dist)
+        predecessors_rows.append(predecessors)
+    return (np.array(dist_rows, dtype=float).reshape(-1, nodes_number),
+            np.array(predecessors_rows, dtype=np.int32).reshape(-1, nodes_number))
+
+
+def neighbors_table(csgraph: csr_matrix) -> np.ndarray:
+    # (nodes_number, max_degree) neighbors, padded with the node itself which is always visited before its neighbors
+    nodes_number = csgraph.shape[0]
+    degrees = np.diff(csgraph.indptr)
+    table = np.repeat(np.arange(nodes_number)[:, None], max(degrees.max(initial=0), 1), axis=1)
+    positions = np.arange(csgraph.indices.size) - np.repeat(csgraph.indptr[:-1], degrees)
+    table[np.repeat(np.arange(nodes_number), degrees), positions] = csgraph.indices
+    return table
+
+
+def bfs_numpy(csgraph: csr_matrix, sources: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+    # all sources are searched together, one level at a time : the frontier holds flat indices of (row, node) pairs
+    table = neighbors_table(csgraph)
+    sources = np.asarray(list(sources), dtype=np.int64)
+    nodes_number, max_degree = table.shape
+    dist = np.full(sources.size * nodes_number, np.inf)
+    predecessors = np.full(sources.size * nodes_number, NO_PREDECESSOR, dtype=np.int32)
+    writers = np.empty(sources.size * nodes_number, dtype=np.int64)
+
+    frontier = np.arange(sources.size) * nodes_number + sources
+    dist[frontier] = 0
+    level = 0
+    while frontier.size:
+        level += 1
+        nodes = frontier % nodes_number
+        reached = ((frontier - nodes)[:, None] + table[nodes]).ravel()
+        parents = np.repeat(nodes, max_degree)
+
+        unvisited = np.isinf(dist[reached])
+        reached, parents = reached[unvisited], parents[unvisited]
+        # a node reached by several parents is kept once, its predecessor is the last parent written
+        candidates = np.arange(reached.size)
+        writers[reached] = candidates
+        kept = writers[reached] == candidates
+        frontier = reached[kept]
+        dist[frontier] = level
+        predecessors[frontier] = parents[kept]
+    return dist.reshape(-1, nodes_number), predecessors.reshape(-1, nodes_number)
+
+
+class ShortestPathsAlgorithm(ABC):
+    # rows are shortest paths from a source node, computed all at once or, if lazy, only for the sources queried
+    # with the previous algorithm of a graph, only the rows whose shortest paths may use a changed edge are recomputed
+    # distances are the same as a full computation, predecessors can only differ between equally short paths
+    MAX_RECOMPUTED_RATIO = 0.5
+
+    def __init__(self, adjacency_matrix: AdjacencyMatrix, previous: Optional["ShortestPathsAlgorithm"] = None,
+                 changed_edges: Optional[List[Tuple[int, int]]] = None, lazy: bool = False,
+                 cache_paths: bool = False):
         self.adjacency_matrix = adjacency_matrix
-        self.dist_matrix, self.predecessors = dijkstra(
-            self.adjacency_matrix.sparce_matrix,
-            return_predecessors=True
-        )
+        self.csgraph: csr_matrix = adjacency_matrix.sparce_matrix
+        self.lazy = lazy
+        self.recomputed_rows = 0
+        # reconstructed paths (shared, not to be modified) and next hops by source node
+        # they are dropped when the source row is recomputed
+        self.cache_paths = cache_paths
+        self.paths_cache: Dict[int, Dict[int, Optional[List[int]]]] = {}
+        self.next_hops_cache: Dict[int, np.ndarray] = {}
+        nodes_number = self.csgraph.shape[0]
+
+        if previous is not None and previous.csgraph.shape == self.csgraph.shape:
+            self.dist_matrix = previous.dist_matrix.copy()
+            self.predecessors = previous.predecessors.copy()
+            self.computed_rows = previous.computed_rows.copy()
+            self.computed_rows[self.find_rows_to_recompute(previous, changed_edges)] = False
+        else:
+            self.dist_matrix = np.full((nodes_number, nodes_number), np.inf)
+            self.predecessors = np.full((nodes_number, nodes_number), NO_PREDECESSOR, dtype=np.int32)
+            self.computed_rows = np.zeros(nodes_number, dtype=bool)
+
+        if lazy:
+            return
+        missing_rows = np.flatnonzero(~self.computed_rows)
+        if missing_rows.size > self.MAX_RECOMPUTED_RATIO * nodes_number:
+            self.dist_matrix, self.predecessors = self.shortest_paths()
+            self.computed_rows[:] = True
+            self.recomputed_rows = nodes_number
+        else:
+            self.compute_rows(missing_rows)
+
+    @abstractmethod
+    def shortest_paths(self, sources: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        pass
+
+    def compute_rows(self, nodes: Iterable[int]) -> None:
+        rows = np.array([node for node in set(nodes) if not self.computed_rows[node]], dtype=np.int32)
+        if rows.size == 0:
+            return
+        self.dist_matrix[rows], self.predecessors[rows] = self.shortest_paths(rows)
+        self.computed_rows[rows] = True
+        self.recomputed_rows += rows.size
+        for row in rows.tolist():
+            self.paths_cache.pop(row, None)
+            self.next_hops_cache.pop(row, None)
+
+    def find_rows_to_recompute(self, previous: "ShortestPathsAlgorithm",
+                               changed_edges: Optional[List[Tuple[int, int]]] = None) -> np.ndarray:
+        if changed_edges is None:
+            changed_edges = find_changed_edges(previous.csgraph, self.csgraph)
+        dist_matrix, predecessors = previous.dist_matrix, previous.predecessors
+
+        affected = np.zeros(dist_matrix.shape[0], dtype=bool)
+        for from_node, to_node in changed_edges:
+            old_weight = edge_weight(previous.csgraph, from_node, to_node)
+            new_weight = edge_weight(self.csgraph, from_node, to_node)
+            dist_to_from_node = dist_matrix[:, from_node]
+            reached = np.isfinite(dist_to_from_node)
+            if new_weight > old_weight:
+                # shortest paths through the edge get longer
+                affected |= predecessors[:, to_node] == from_node
+                affected |= reached & (dist_to_from_node + old_weight <= dist_matrix[:, to_node])
+            elif new_weight < old_weight:
+                # the edge may give shorter (or as short) paths
+                affected |= reached & (dist_to_from_node + new_weight <= dist_matrix[:, to_node])
+        return np.flatnonzero(affected & previous.computed_rows)
 
     def get_shortest_path(self, nodes_pair: NodesPair) -> Optional[list[int]]:
         distance = nodes_pair.distance
@@ -21,29 +171,174 @@ class DijkstraAlgorithm:
 
         from_node = nodes_pair.from_node
         to_node = nodes_pair.to_node
+        self.compute_rows([from_node])
+        if self.cache_paths and to_node in self.paths_cache.get(from_node, {}):
+            return self.paths_cache[from_node][to_node]
 
-        shortest_path = [to_node]
-        predecessor = self.predecessors[from_node, to_node]
-        while predecessor != from_node and predecessor != -9999:
-            next_node = predecessor
-            shortest_path.insert(0, next_node)
-            predecessor = self.predecessors[from_node, next_node]
+        predecessors = self.predecessors[from_node]
+        reversed_path = [to_node]
+        predecessor = int(predecessors[to_node])
+        while predecessor != from_node and predecessor != NO_PREDECESSOR:
+            reversed_path.append(predecessor)
+            predecessor = int(predecessors[predecessor])
+        shortest_path = reversed_path[::-1]
 
+        if self.cache_paths:
+            self.paths_cache.setdefault(from_node, {})[to_node] = shortest_path
         return shortest_path
 
+    def get_next_hops(self, from_node: int) -> np.ndarray:
+        # first node after from_node on the shortest path to every node, NO_PREDECESSOR if unreachable or from_node
+        self.compute_rows([from_node])
+        if from_node in self.next_hops_cache:
+            return self.next_hops_cache[from_node]
+
+        predecessors = self.predecessors[from_node]
+        next_hops = np.arange(predecessors.size, dtype=np.int32)
+        ancestors = predecessors.copy()
+        # every walk goes one step up its path until it reaches from_node or no predecessor
+        walking = (ancestors != from_node) & (ancestors != NO_PREDECESSOR)
+        while walking.any():
+            next_hops[walking] = ancestors[walking]
+            ancestors[walking] = predecessors[ancestors[walking]]
+            walking &= (ancestors != from_node) & (ancestors != NO_PREDECESSOR)
+        next_hops[ancestors != from_node] = NO_PREDECESSOR
+
+        if self.cache_paths:
+            self.next_hops_cache[from_node] = next_hops
+        return next_hops
+
+    def get_next_hop(self, from_node: int, to_node: int) -> Optional[int]:
+        next_hop = int(self.get_next_hops(from_node)[to_node])
+        return None if next_hop == NO_PREDECESSOR else next_hop
+
     def find_closest_nodes_pair(self, from_nodes: Iterable[int], to_nodes: Iterable[int]) -> NodesPair:
-        closest_pair = NodesPair()
+        return self.find_closest_nodes_pairs([(from_nodes, to_nodes)])[0]
 
-        for to_node in to_nodes:
-            for from_node in from_nodes:
-                distance = self.dist_matrix[from_node, to_node]
+    def find_closest_nodes_pairs(self, queries: Iterable[Tuple[Iterable[int], Iterable[int]]]) -> List[NodesPair]:
+        queries = [(list(from_nodes), list(to_nodes)) for from_nodes, to_nodes in queries]
+        self.compute_rows(from_node for from_nodes, _ in queries for from_node in from_nodes)
 
+        closest_pairs = []
+        for from_nodes, to_nodes in queries:
+            closest_pair = NodesPair()
+            if from_nodes and to_nodes:
+                # transposed so that argmin returns the first minimum with to_nodes as outer loop, from_nodes inner
+                distances = self.dist_matrix[np.ix_(from_nodes, to_nodes)].T
+                to_index, from_index = np.unravel_index(np.argmin(distances), distances.shape)
+                distance = distances[to_index, from_index]
                 if distance < closest_pair.distance:
-                    closest_pair.from_node = from_node
-                    closest_pair.to_node = to_node
+                    closest_pair.from_node = from_nodes[from_index]
+                    closest_pair.to_node = to_nodes[to_index]
                     closest_pair.distance = int(distance)
 
-        closest_pair.shortest_path = self.get_shortest_path(closest_pair)
+            closest_pair.shortest_path = self.get_shortest_path(closest_pair)
+            closest_pairs.append(closest_pair)
+
+        return closest_pairs
+
+
+class DijkstraAlgorithm(ShortestPathsAlgorithm):
+    def shortest_paths(self, sources: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if sources is None:
+            return dijkstra(self.csgraph, return_predecessors=True)
+        return dijkstra(self.csgraph, return_predecessors=True, indices=sources)
+
+
+class BreadthFirstSearchAlgorithm(ShortestPathsAlgorithm):
+    # unit weights only : every edge stored in the graph costs 1
+    ENGINES = {"deque": bfs_deque, "numpy": bfs_numpy}
+
+    def __init__(self, adjacency_matrix: AdjacencyMatrix, previous: Optional[ShortestPathsAlgorithm] = None,
+                 changed_edges: Optional[List[Tuple[int, int]]] = None, lazy: bool = False,
+                 cache_paths: bool = False, engine: str = "numpy"):
+        self.engine = self.ENGINES[engine]
+        super().__init__(adjacency_matrix, previous=previous, changed_edges=changed_edges, lazy=lazy,
+                         cache_paths=cache_paths)
+
+    def shortest_paths(self, sources: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.engine(self.csgraph, range(self.csgraph.shape[0]) if sources is None else sources)
+
+
+def create_shortest_paths_algorithm(adjacency_matrix: AdjacencyMatrix,
+                                    previous: Optional[ShortestPathsAlgorithm] = None,
+                                    changed_edges: Optional[List[Tuple[int, int]]] = None,
+                                    lazy: bool = False, cache_paths: bool = False) -> ShortestPathsAlgorithm:
+    weights = adjacency_matrix.sparce_matrix.data
+    if np.all(weights == 1):
+        algorithm_class = BreadthFirstSearchAlgorithm
+    else:
+        algorithm_class = DijkstraAlgorithm
+    return algorithm_class(adjacency_matrix, previous=previous, changed_edges=changed_edges, lazy=lazy,
+                           cache_paths=cache_paths)
+
+
+def multi_source_dijkstra(csgraph: csr_matrix, sources: Iterable[int], targets: Optional[Iterable[int]] = None,
+                          first_target_only: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # single search from a virtual super-source linked to every source with a 0 weight
+    # it stops once all targets (or the first one) are settled : other nodes distances may not be final
+    nodes_number = csgraph.shape[0]
+    indptr, indices, weights = csgraph.indptr.tolist(), csgraph.indices.tolist(), csgraph.data.tolist()
+    dist = [np.inf] * nodes_number
+    predecessors = [NO_PREDECESSOR] * nodes_number
+    origins = [NO_PREDECESSOR] * nodes_number
+    settled = [False] * nodes_number
+
+    heap = []
+    for source in sources:
+        if dist[source] > 0:
+            dist[source] = 0
+            origins[source] = source
+            heap.append((0, source))
+    heapq.heapify(heap)
+
+    targets_left = set(targets) if targets is not None else None
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = True
+
+        if targets_left is not None and node in targets_left:
+            targets_left.remove(node)
+            if first_target_only or not targets_left:
+                break
+
+        for k in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[k]
+            neighbor_distance = distance + weights[k]
+            if neighbor_distance < dist[neighbor]:
+                dist[neighbor] = neighbor_distance
+                predecessors[neighbor] = node
+                origins[neighbor] = origins[node]
+                heapq.heappush(heap, (neighbor_distance, neighbor))
+
+    return np.array(dist), np.array(predecessors), np.array(origins)
+
+
+def find_closest_nodes_pair_from_sources(csgraph: csr_matrix, from_nodes: Iterable[int],
+                                         to_nodes: Iterable[int]) -> NodesPair:
+    # one search from all from_nodes, stopped at the first to_node reached
+    # equally close pairs may be chosen differently than DijkstraAlgorithm.find_closest_nodes_pair
+    to_nodes = set(to_nodes)
+    dist, predecessors, origins = multi_source_dijkstra(csgraph, from_nodes, to_nodes, first_target_only=True)
+
+    closest_pair = NodesPair()
+    reached_to_nodes = [to_node for to_node in to_nodes if np.isfinite(dist[to_node])]
+    if not reached_to_nodes:
+        return closest_pair
 
+    to_node = min(reached_to_nodes, key=lambda node: dist[node])
+    closest_pair.from_node = int(origins[to_node])
+    closest_pair.to_node = to_node
+    closest_pair.distance = int(dist[to_node])
+    if closest_pair.distance == 0:
         return closest_pair
 
+    shortest_path = [to_node]
+    predecessor = predecessors[to_node]
+    while predecessor != closest_pair.from_node:
+        shortest_path.append(int(predecessor))
+        predecessor = predecessors[predecessor]
+    closest_pair.shortest_path = shortest_path[::-1]
+    return closest_pair
@@ -7,7 +7,7 @@
 # https://en.wikipedia.org/wiki/Shortest_path_problem
 
 
-from typing import Dict, Union, List, Optional
+from typing import Dict, Union, List, Optional, Set, Tuple
 from dataclasses import dataclass
 import copy
 
@@ -24,8 +24,11 @@ class Edge:
 
 
 class AdjacencyMatrix:
+    # after a checkpoint, previous values of the modified entries are logged to be restored by rollback
     def __init__(self, nodes_edges: np.ndarray):
         self.array: np.ndarray = nodes_edges
+        self._undo_log: List[Tuple[object, np.ndarray]] = []
+        self._checkpoints: List[int] = []
 
     @property
     def sparce_matrix(self) -> csr_matrix:
@@ -35,8 +38,20 @@ class AdjacencyMatrix:
         return self.array.__getitem__(key)
 
     def __setitem__(self, key, value: float):
+        if self._checkpoints:
+            self._undo_log.append((key, np.copy(self.array[key])))
         self.array.__setitem__(key, value)
 
+    def checkpoint(self):
+        self._checkpoints.append(len(self._undo_log))
+
+    def rollback(self):
+        # back to the state of the last checkpoint, in O(changes made since)
+        start = self._checkpoints.pop()
+        for key, value in reversed(self._undo_log[start:]):
+            self.array.__setitem__(key, value)
+        del self._undo_log[start:]
+
     def update_edge(self, edge: Edge, weight: float):
         self[edge.from_node, edge.to_node] = weight
         if not edge.directed:
@@ -53,9 +68,88 @@ class AdjacencyMatrix:
         return AdjacencyMatrix(nodes_edges=copy_array)
 
 
+class SparseAdjacencyMatrix(AdjacencyMatrix):
+    # edges updates are logged in a delta dict (O(1)) and merged into the csr matrix when it is read
+    # a weight of 0 removes the edge, like in the dense matrix : explicitly stored zeros are dropped too
+    def __init__(self, nodes_number: int, sparce_matrix: Optional[csr_matrix] = None):
+        self.nodes_number = nodes_number
+        if sparce_matrix is None:
+            sparce_matrix = csr_matrix((nodes_number, nodes_number), dtype=float)
+        elif not sparce_matrix.data.all():
+            sparce_matrix = sparce_matrix.copy()
+            sparce_matrix.eliminate_zeros()
+        self._sparce_matrix: csr_matrix = sparce_matrix
+        self._delta: Dict[Tuple[int, int], float] = {}
+        self._checkpoints: List[Tuple[csr_matrix, Dict[Tuple[int, int], float]]] = []
+
+    @property
+    def array(self) -> np.ndarray:
+        return self.sparce_matrix.toarray()
+
+    @property
+    def sparce_matrix(self) -> csr_matrix:
+        if self._delta:
+            self._merge_delta()
+        return self._sparce_matrix
+
+    def _merge_delta(self):
+        n = self.nodes_number
+        coo = self._sparce_matrix.tocoo()
+        delta_keys = np.fromiter((i * n + j for i, j in self._delta.keys()), dtype=np.int64, count=len(self._delta))
+        delta_weights = np.fromiter(self._delta.values(), dtype=float, count=len(self._delta))
+        kept = ~np.isin(coo.row.astype(np.int64) * n + coo.col, delta_keys)
+        added = delta_weights != 0
+
+        rows = np.concatenate((coo.row[kept], delta_keys[added] // n))
+        cols = np.concatenate((coo.col[kept], delta_keys[added] % n))
+        weights = np.concatenate((coo.data[kept], delta_weights[added]))
+        self._sparce_matrix = csr_matrix((weights, (rows, cols)), shape=(n, n))
+        self._delta = {}
+
+    @staticmethod
+    def _is_entry(key) -> bool:
+        return isinstance(key, tuple) and len(key) == 2 and all(isinstance(k, (int, np.integer)) for k in key)
+
+    def __getitem__(self, key):
+        # single entries are read without merging the delta, rows and other keys are read like in the dense matrix
+        if self._is_entry(key):
+            i, j = key
+            weight = self._delta.get((i, j))
+            if weight is not None:
+                return weight
+            return self._sparce_matrix[i, j]
+        if isinstance(key, (int, np.integer)):
+            return self.sparce_matrix.getrow(key).toarray().ravel()
+        return self.array[key]
+
+    def __setitem__(self, key, value: float):
+        if not self._is_entry(key):
+            raise TypeError(f"SparseAdjacencyMatrix entries are set one at a time with (i, j) keys, not {key!r}")
+        i, j = key
+        self._delta[(int(i), int(j))] = value
+
+    def checkpoint(self):
+        # csr matrices are never modified in place : a snapshot is the current one and a copy of the delta
+        self._checkpoints.append((self._sparce_matrix, self._delta.copy()))
+
+    def rollback(self):
+        self._sparce_matrix, self._delta = self._checkpoints.pop()
+
+    def copy(self):
+        # merged csr matrices are never modified in place : copies share them
+        copy_adjacency_matrix = SparseAdjacencyMatrix(nodes_number=self.nodes_number,
+                                                      sparce_matrix=self._sparce_matrix)
+        copy_adjacency_matrix._delta = self._delta.copy()
+        return copy_adjacency_matrix
+
+
 class AdjacencyList:
+    # after a checkpoint, neighbors of a node are saved the first time they are modified to be restored by rollback
+    # changes must go through __setitem__, add_edge or remove_edge to be logged
     def __init__(self, nodes_neighbors: Dict[int, Dict[int, float]]):
         self.nodes_neighbors = nodes_neighbors
+        self._undo_log: List[Tuple[int, Optional[Dict[int, float]]]] = []
+        self._checkpoints: List[Tuple[int, Set[int]]] = []
 
     @property
     def nodes(self) -> List[int]:
@@ -69,8 +163,31 @@ class AdjacencyList:
         return self.nodes_neighbors.get(node)
 
     def __setitem__(self, node: int, value: Dict[int, float]):
+        self._save_node(node)
         self.nodes_neighbors[node] = value
 
+    def _save_node(self, node: int):
+        if not self._checkpoints:
+            return
+        _, saved_nodes = self._checkpoints[-1]
+        if node not in saved_nodes:
+            saved_nodes.add(node)
+            neighbors = self.nodes_neighbors.get(node)
+            self._undo_log.append((node, None if neighbors is None else neighbors.copy()))
+
+    def checkpoint(self):
+        self._checkpoints.append((len(self._undo_log), set()))
+
+    def rollback(self):
+        # back to the state of the last checkpoint, in O(nodes modified since)
+        start, _ = self._checkpoints.pop()
+        for node, neighbors in reversed(self._undo_log[start:]):
+            if neighbors is None:
+                self.nodes_neighbors.pop(node, None)
+            else:
+                self.nodes_neighbors[node] = neighbors
+        del self._undo_log[start:]
+
     def add_edge(self, edge: Edge):
         i, j, w = edge.from_node, edge.to_node, edge.weight
 
@@ -79,6 +196,7 @@ class AdjacencyList:
             edges_to_add.append((j, i, w))
 
         for node, neighbor, weight in edges_to_add:
+            self._save_node(node)
             if not self[node]:
                 self[node] = {}
             self[node][neighbor] = weight
@@ -91,6 +209,7 @@ class AdjacencyList:
             edges_to_remove.append((j, i))
 
         for node, neighbor in edges_to_remove:
+            self._save_node(node)
             if self[node]:
                 try:
                     del self[node][neighbor]
@@ -102,6 +221,113 @@ class AdjacencyList:
         return AdjacencyList(nodes_neighbors=copy_nodes_neighbors)
 
 
+class CompactAdjacencyList:
+    # fixed degree rows : neighbors (int32, -1 padded) and weights (float32) of a node are contiguous
+    # rows and degree grow by doubling when needed, removed neighbors are replaced by the last one of the row
+    __slots__ = ("neighbors", "weights", "degrees", "known", "_checkpoints")
+    NO_NEIGHBOR = -1
+
+    def __init__(self, nodes_number: int = 0, max_degree: int = 4):
+        self.neighbors = np.full((nodes_number, max_degree), self.NO_NEIGHBOR, dtype=np.int32)
+        self.weights = np.zeros((nodes_number, max_degree), dtype=np.float32)
+        self.degrees = np.zeros(nodes_number, dtype=np.int32)
+        self.known = np.zeros(nodes_number, dtype=bool)
+        self._checkpoints: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+    @property
+    def nodes(self) -> List[int]:
+        return np.flatnonzero(self.known).tolist()
+
+    @property
+    def nodes_number(self) -> int:
+        return int(np.count_nonzero(self.known))
+
+    @property
+    def max_degree(self) -> int:
+        return self.neighbors.shape[1]
+
+    def neighbors_of(self, node: int) -> np.ndarray:
+        if node >= self.degrees.size:
+            return self.neighbors[:0, 0]
+        return self.neighbors[node, :self.degrees[node]]
+
+    def weights_of(self, node: int) -> np.ndarray:
+        if node >= self.degrees.size:
+            return self.weights[:0, 0]
+        return self.weights[node, :self.degrees[node]]
+
+    def __getitem__(self, node: int) -> Union[None, Dict[int, float]]:
+        # same view as AdjacencyList, built on demand
+        if node >= self.known.size or not self.known[node]:
+            return None
+        return dict(zip(self.neighbors_of(node).tolist(), self.weights_of(node).tolist()))
+
+    def _reserve(self, nodes_number: int, max_degree: int):
+        rows = max(nodes_number - self.degrees.size, 0)
+        if rows:
+            rows = max(rows, self.degrees.size)
+            self.degrees = np.concatenate((self.degrees, np.zeros(rows, dtype=np.int32)))
+            self.known = np.concatenate((self.known, np.zeros(rows, dtype=bool)))
+        columns = max(max_degree - self.max_degree, 0)
+        if columns:
+            columns = max(columns, self.max_degree)
+        if rows or columns:
+            self.neighbors = np.pad(self.neighbors, ((0, rows), (0, columns)), constant_values=self.NO_NEIGHBOR)
+            self.weights = np.pad(self.weights, ((0, rows), (0, columns)))
+
+    def _set_neighbor(self, node: int, neighbor: int, weight: float):
+        if max(node, neighbor) >= self.degrees.size:
+            self._reserve(max(node, neighbor) + 1, 0)
+        self.known[node] = True
+        degree = int(self.degrees[node])
+        row = self.neighbors[node, :degree].tolist()
+        if neighbor in row:
+            self.weights[node, row.index(neighbor)] = weight
+            return
+        if degree == self.max_degree:
+            self._reserve(0, degree + 1)
+        self.neighbors[node, degree] = neighbor
+        self.weights[node, degree] = weight
+        self.degrees[node] = degree + 1
+
+    def _unset_neighbor(self, node: int, neighbor: int):
+        if node >= self.degrees.size:
+            return
+        degree = int(self.degrees[node])
+        row = self.neighbors[node, :degree].tolist()
+        if neighbor in row:
+            position, last = row.index(neighbor), degree - 1
+            self.neighbors[node, position] = row[last]
+            self.weights[node, position] = self.weights[node, last]
+            self.neighbors[node, last] = self.NO_NEIGHBOR
+            self.weights[node, last] = 0
+            self.degrees[node] = last
+
+    def add_edge(self, edge: Edge):
+        self._set_neighbor(edge.from_node, edge.to_node, edge.weight)
+        if not edge.directed:
+            self._set_neighbor(edge.to_node, edge.from_node, edge.weight)
+
+    def remove_edge(self, edge: Edge):
+        self._unset_neighbor(edge.from_node, edge.to_node)
+        if not edge.directed:
+            self._unset_neighbor(edge.to_node, edge.from_node)
+
+    def checkpoint(self):
+        self._checkpoints.append((self.neighbors.copy(), self.weights.copy(), self.degrees.copy(), self.known.copy()))
+
+    def rollback(self):
+        self.neighbors, self.weights, self.degrees, self.known = self._checkpoints.pop()
+
+    def copy(self):
+        copy_adjacency_list = CompactAdjacencyList()
+        copy_adjacency_list.neighbors = self.neighbors.copy()
+        copy_adjacency_list.weights = self.weights.copy()
+        copy_adjacency_list.degrees = self.degrees.copy()
+        copy_adjacency_list.known = self.known.copy()
+        return copy_adjacency_list
+
+
 @dataclass
 class NodesPair:
     from_node: int = None
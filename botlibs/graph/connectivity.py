@@ -0,0 +1,217 @@
+# https://en.wikipedia.org/wiki/Disjoint-set_data_structure
+# https://en.wikipedia.org/wiki/Component_(graph_theory)
+# https://en.wikipedia.org/wiki/Biconnected_component
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components as csgraph_connected_components
+
+from botlibs.graph.classes import AdjacencyMatrix, AdjacencyList, CompactAdjacencyList
+
+Adjacency = Union[AdjacencyMatrix, AdjacencyList, CompactAdjacencyList]
+
+NO_COMPONENT = -1
+
+
+class UnionFind:
+    # union by size, path compression in find
+    def __init__(self, nodes_number: int):
+        self.parents: List[int] = list(range(nodes_number))
+        self.sizes: List[int] = [1] * nodes_number
+        self.components_number = nodes_number
+
+    def find(self, node: int) -> int:
+        root = node
+        while self.parents[root] != root:
+            root = self.parents[root]
+        while self.parents[node] != root:
+            self.parents[node], node = root, self.parents[node]
+        return root
+
+    def union(self, node_1: int, node_2: int) -> bool:
+        root_1, root_2 = self.find(node_1), self.find(node_2)
+        if root_1 == root_2:
+            return False
+        if self.sizes[root_1] < self.sizes[root_2]:
+            root_1, root_2 = root_2, root_1
+        self.parents[root_2] = root_1
+        self.sizes[root_1] += self.sizes[root_2]
+        self.components_number -= 1
+        return True
+
+    def connected(self, node_1: int, node_2: int) -> bool:
+        return self.find(node_1) == self.find(node_2)
+
+    def labels(self) -> np.ndarray:
+        # components are numbered by order of their first node
+        labels_by_root = {}
+        return np.array([labels_by_root.setdefault(self.find(node), len(labels_by_root))
+                         for node in range(len(self.parents))], dtype=np.int32)
+
+
+def to_csgraph(adjacency: Adjacency, nodes_number: Optional[int] = None) -> csr_matrix:
+    if isinstance(adjacency, AdjacencyMatrix):
+        return adjacency.sparce_matrix
+    nodes = adjacency.nodes
+    rows, cols = [], []
+    for node in nodes:
+        neighbors = list(adjacency[node])
+        rows.extend([node] * len(neighbors))
+        cols.extend(neighbors)
+    if nodes_number is None:
+        nodes_number = max(nodes + cols, default=-1) + 1
+    return csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(nodes_number, nodes_number))
+
+
+def connected_components(adjacency: Adjacency, directed: bool = False, connection: str = "weak",
+                         nodes_number: Optional[int] = None) -> Tuple[int, np.ndarray]:
+    return csgraph_connected_components(to_csgraph(adjacency, nodes_number), directed=directed,
+                                        connection=connection, return_labels=True)
+
+
+def articulation_points_and_bridges(adjacency: Adjacency,
+                                    nodes_number: Optional[int] = None) -> Tuple[Set[int], Set[Tuple[int, int]]]:
+    # Tarjan low links on the undirected graph, with an explicit stack instead of recursion
+    # bridges are given as (smaller node, greater node)
+    csgraph = to_csgraph(adjacency, nodes_number)
+    csgraph = csgraph + csgraph.T
+    indptr, indices = csgraph.indptr.tolist(), csgraph.indices.tolist()
+    nodes_number = csgraph.shape[0]
+
+    discovery = [-1] * nodes_number
+    low = [0] * nodes_number
+    articulation_points, bridges = set(), set()
+    time = 0
+    for root in range(nodes_number):
+        if discovery[root] != -1:
+            continue
+        discovery[root] = low[root] = time
+        time += 1
+        root_children = 0
+        # (node, parent, next neighbor position)
+        stack = [(root, -1, indptr[root])]
+        while stack:
+            node, parent, position = stack[-1]
+            if position < indptr[node + 1]:
+                stack[-1] = (node, parent, position + 1)
+                neighbor = indices[position]
+                if discovery[neighbor] == -1:
+                    discovery[neighbor] = low[neighbor] = time
+                    time += 1
+                    if node == root:
+                        root_children += 1
+                    stack.append((neighbor, node, indptr[neighbor]))
+                elif neighbor != parent:
+                    low[node] = min(low[node], discovery[neighbor])
+                continue
+
+            stack.pop()
+            if parent != -1:
+                low[parent] = min(low[parent], low[node])
+                if low[node] > discovery[parent]:
+                    bridges.add((min(parent, node), max(parent, node)))
+                if parent != root and low[node] >= discovery[parent]:
+                    articulation_points.add(parent)
+        if root_children > 1:
+            articulation_points.add(root)
+    return articulation_points, bridges
+
+
+class IncrementalComponents:
+    # components of the unblocked nodes of an undirected graph, updated when nodes are blocked (walls, grass, ...)
+    # or unblocked : only the component split, or the components merged, are relabelled
+    def __init__(self, adjacency: Adjacency, blocked: Optional[Iterable[int]] = None,
+                 nodes_number: Optional[int] = None):
+        csgraph = to_csgraph(adjacency, nodes_number)
+        csgraph = csgraph + csgraph.T
+        self.indptr: List[int] = csgraph.indptr.tolist()
+        self.indices: List[int] = csgraph.indices.tolist()
+        self.nodes_number = csgraph.shape[0]
+        self.blocked: List[bool] = [False] * self.nodes_number
+        for node in blocked or []:
+            self.blocked[node] = True
+
+        unblocked = ~np.array(self.blocked, dtype=bool)
+        kept = csgraph.multiply(unblocked[:, None]).multiply(unblocked[None, :]).tocsr()
+        # stored zeros would still be edges for scipy
+        kept.eliminate_zeros()
+        _, labels = csgraph_connected_components(kept, directed=False, return_labels=True)
+        labels[~unblocked] = NO_COMPONENT
+        self.labels: List[int] = labels.tolist()
+        self.members: Dict[int, Set[int]] = {}
+        for node, label in enumerate(self.labels):
+            if label != NO_COMPONENT:
+                self.members.setdefault(label, set()).add(node)
+        self._next_label = max(self.members, default=-1) + 1
+
+    @property
+    def components_number(self) -> int:
+        return len(self.members)
+
+    def neighbors(self, node: int) -> List[int]:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def connected(self, node_1: int, node_2: int) -> bool:
+        return self.labels[node_1] != NO_COMPONENT and self.labels[node_1] == self.labels[node_2]
+
+    def _new_label(self) -> int:
+        self._next_label += 1
+        return self._next_label - 1
+
+    def _reach(self, start: int, label: int) -> Set[int]:
+        reached = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in self.neighbors(node):
+                if self.labels[neighbor] == label and neighbor not in reached:
+                    reached.add(neighbor)
+                    stack.append(neighbor)
+        return reached
+
+    def block(self, node: int):
+        if self.blocked[node]:
+            return
+        self.blocked[node] = True
+        old_label = self.labels[node]
+        self.labels[node] = NO_COMPONENT
+        old_members = self.members.pop(old_label)
+        old_members.discard(node)
+
+        # nodes reached from each neighbor form the new components, the first one keeps the old label
+        reached_nodes = set()
+        for neighbor in self.neighbors(node):
+            if len(reached_nodes) == len(old_members):
+                break
+            if self.labels[neighbor] != old_label or neighbor in reached_nodes:
+                continue
+            reached = self._reach(neighbor, old_label)
+            label = self._new_label() if reached_nodes else old_label
+            for reached_node in reached:
+                self.labels[reached_node] = label
+            self.members[label] = reached
+            reached_nodes |= reached
+
+    def unblock(self, node: int):
+        if not self.blocked[node]:
+            return
+        self.blocked[node] = False
+        labels = {self.labels[neighbor] for neighbor in self.neighbors(node)
+                  if not self.blocked[neighbor] and neighbor != node}
+        if not labels:
+            label = self._new_label()
+            self.labels[node] = label
+            self.members[label] = {node}
+            return
+
+        # smaller components are merged into the biggest one
+        label = max(labels, key=lambda label: len(self.members[label]))
+        members = self.members[label]
+        for other_label in labels - {label}:
+            for other_node in self.members.pop(other_label):
+                self.labels[other_node] = label
+                members.add(other_node)
+        self.labels[node] = label
+        members.add(node)
@@ -2,7 +2,9 @@ from typing import Iterable
 
 import numpy as np
 
-from botlibs.graph.classes import Edge, AdjacencyMatrix, AdjacencyList
+from scipy.sparse import csr_matrix
+
+from botlibs.graph.classes import Edge, AdjacencyMatrix, AdjacencyList, CompactAdjacencyList, SparseAdjacencyMatrix
 
 
 def create_adjacency_matrix_from_edges(edges: Iterable[Edge], nodes_number: int) -> AdjacencyMatrix:
@@ -12,9 +14,31 @@ def create_adjacency_matrix_from_edges(edges: Iterable[Edge], nodes_number: int)
     return adjacency_matrix
 
 
+def create_sparse_adjacency_matrix_from_edges(edges: Iterable[Edge], nodes_number: int) -> SparseAdjacencyMatrix:
+    # later edges overwrite earlier ones between the same nodes, like in the dense matrix
+    weights = {}
+    for edge in edges:
+        weights[(edge.from_node, edge.to_node)] = edge.weight
+        if not edge.directed:
+            weights[(edge.to_node, edge.from_node)] = edge.weight
+    weights = {nodes: weight for nodes, weight in weights.items() if weight != 0}
+
+    rows = np.fromiter((i for i, _ in weights.keys()), dtype=np.int32, count=len(weights))
+    cols = np.fromiter((j for _, j in weights.keys()), dtype=np.int32, count=len(weights))
+    data = np.fromiter(weights.values(), dtype=float, count=len(weights))
+    sparce_matrix = csr_matrix((data, (rows, cols)), shape=(nodes_number, nodes_number))
+    return SparseAdjacencyMatrix(nodes_number=nodes_number, sparce_matrix=sparce_matrix)
+
+
 def create_adjacency_list_from_edges(edges: Iterable[Edge]) -> AdjacencyList:
     adjacency_list = AdjacencyList({})
     for edge in edges:
         adjacency_list.add_edge(edge)
     return adjacency_list
 
+
+def create_compact_adjacency_list_from_edges(edges: Iterable[Edge]) -> CompactAdjacencyList:
+    compact_adjacency_list = CompactAdjacencyList()
+    for edge in edges:
+        compact_adjacency_list.add_edge(edge)
+    return compact_adjacency_list
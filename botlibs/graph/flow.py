@@ -0,0 +1,189 @@
+# https://en.wikipedia.org/wiki/Maximum_flow_problem
+# https://en.wikipedia.org/wiki/Edmonds%E2%80%93Karp_algorithm
+# https://en.wikipedia.org/wiki/Dinic%27s_algorithm
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+
+import numpy as np
+
+from botlibs.graph.classes import AdjacencyList
+
+Capacities = Dict[int, Dict[int, float]]
+# a CompactAdjacencyList is accepted too, it isn't named in annotations so that bots not using it don't ship it
+
+# several sources (sinks) are linked to a super source (sink) with an infinite capacity
+SUPER_SOURCE = -1
+SUPER_SINK = -2
+
+
+@dataclass
+class Flow:
+    value: float
+    residual: Capacities
+    source_side: Set[int] = field(default_factory=set)
+    cut_edges: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def create_residual(adjacency_list: AdjacencyList) -> Capacities:
+    # weights are capacities, reverse edges are added with a 0 capacity
+    residual = {}
+    for node in adjacency_list.nodes:
+        for neighbor, capacity in adjacency_list[node].items():
+            node_residual = residual.setdefault(node, {})
+            node_residual[neighbor] = node_residual.get(neighbor, 0) + capacity
+            residual.setdefault(neighbor, {}).setdefault(node, 0)
+    return residual
+
+
+def link_super_nodes(residual: Capacities, sources: Iterable[int], sinks: Iterable[int]):
+    residual[SUPER_SOURCE] = {source: np.inf for source in sources}
+    residual[SUPER_SINK] = {}
+    for source in residual[SUPER_SOURCE]:
+        residual.setdefault(source, {})[SUPER_SOURCE] = 0
+    for sink in sinks:
+        residual.setdefault(sink, {})[SUPER_SINK] = np.inf
+        residual[SUPER_SINK][sink] = 0
+
+
+def augment(residual: Capacities, path: List[int]) -> float:
+    bottleneck = min(residual[u][v] for u, v in zip(path, path[1:]))
+    for u, v in zip(path, path[1:]):
+        residual[u][v] -= bottleneck
+        residual[v][u] += bottleneck
+    return bottleneck
+
+
+def edmonds_karp(residual: Capacities, source: int, sink: int) -> float:
+    # shortest augmenting paths found by BFS, residual is updated in place
+    flow = 0
+    while True:
+        parents = {source: None}
+        queue = deque([source])
+        while queue and sink not in parents:
+            node = queue.popleft()
+            for neighbor, capacity in residual[node].items():
+                if capacity > 0 and neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append(neighbor)
+        if sink not in parents:
+            return flow
+
+        path = [sink]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        flow += augment(residual, path[::-1])
+
+
+def bfs_levels(residual: Capacities, source: int) -> Dict[int, int]:
+    levels = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor, capacity in residual[node].items():
+            if capacity > 0 and neighbor not in levels:
+                levels[neighbor] = levels[node] + 1
+                queue.append(neighbor)
+    return levels
+
+
+def dinic(residual: Capacities, source: int, sink: int) -> float:
+    # blocking flows on the levels graph, dead ends are dropped from the neighbors left to explore
+    flow = 0
+    while True:
+        levels = bfs_levels(residual, source)
+        if sink not in levels:
+            return flow
+
+        neighbors_left = {node: list(neighbors) for node, neighbors in residual.items()}
+        path = [source]
+        while path:
+            node = path[-1]
+            if node == sink:
+                flow += augment(residual, path)
+                path = [source]
+                continue
+
+            next_level = levels[node] + 1
+            candidates = neighbors_left[node]
+            while candidates and (residual[node][candidates[-1]] <= 0
+                                  or levels.get(candidates[-1]) != next_level):
+                candidates.pop()
+            if candidates:
+                path.append(candidates[-1])
+            else:
+                path.pop()
+                if path:
+                    neighbors_left[path[-1]].pop()
+
+
+def max_flow(adjacency_list: AdjacencyList, sources: Iterable[int], sinks: Iterable[int],
+             algorithm: str = "dinic") -> Flow:
+    residual = create_residual(adjacency_list)
+    link_super_nodes(residual, sources, sinks)
+    # dispatched here rather than by a module level dict, so that unused algorithms stay dead code when built
+    if algorithm == "dinic":
+        value = dinic(residual, SUPER_SOURCE, SUPER_SINK)
+    elif algorithm == "edmonds_karp":
+        value = edmonds_karp(residual, SUPER_SOURCE, SUPER_SINK)
+    else:
+        raise ValueError(f"Unknown algorithm {algorithm}, expected dinic or edmonds_karp")
+
+    # the minimum cut is made of the saturated edges leaving the nodes still reachable from the sources
+    source_side = set(bfs_levels(residual, SUPER_SOURCE)) - {SUPER_SOURCE}
+    cut_edges = [(node, neighbor) for node in source_side
+                 for neighbor, capacity in (adjacency_list[node] or {}).items()
+                 if neighbor not in source_side and capacity > 0]
+    return Flow(value=value, residual=residual, source_side=source_side, cut_edges=cut_edges)
+
+
+class DangerousLinksScorer:
+    # not flow based : the agent moves while links are cut one per turn, which a single min cut doesn't model
+    # gateways linked to each node are updated when a link is cut
+    # a node is as dangerous as its number of gateways links minus the free turns the agent has to reach it
+    # moving to a node linked to a gateway gives no free turn, since it must be answered by a cut
+    # equally dangerous nodes are sorted by number of moves from the agent
+    def __init__(self, adjacency_list: AdjacencyList, gateways: Iterable[int]):
+        self.adjacency_list = adjacency_list
+        self.gateways = set(gateways)
+        self.gateways_by_node: Dict[int, Set[int]] = {}
+        for gateway in self.gateways:
+            for node in adjacency_list[gateway] or {}:
+                if node not in self.gateways:
+                    self.gateways_by_node.setdefault(node, set()).add(gateway)
+
+    def cut(self, from_node: int, to_node: int):
+        for node, gateway in [(from_node, to_node), (to_node, from_node)]:
+            gateways = self.gateways_by_node.get(node)
+            if gateways is not None:
+                gateways.discard(gateway)
+                if not gateways:
+                    del self.gateways_by_node[node]
+
+    def most_dangerous_link(self, agent_node: int) -> Optional[Tuple[int, int]]:
+        if agent_node in self.gateways_by_node:
+            return agent_node, min(self.gateways_by_node[agent_node])
+
+        # one search keyed on (free turns, moves) : moves are counted along the paths giving the least free turns
+        keys = {agent_node: (0, 0)}
+        heap = [(0, 0, agent_node)]
+        while heap:
+            free_turns, moves, node = heapq.heappop(heap)
+            if keys[node] < (free_turns, moves):
+                continue
+            for neighbor in self.adjacency_list[node] or {}:
+                if neighbor in self.gateways:
+                    continue
+                key = (free_turns + (0 if neighbor in self.gateways_by_node else 1), moves + 1)
+                if key < keys.get(neighbor, (np.inf, np.inf)):
+                    keys[neighbor] = key
+                    heapq.heappush(heap, (*key, neighbor))
+
+        reachable_nodes = [node for node in self.gateways_by_node if node in keys]
+        if not reachable_nodes:
+            return None
+        node = min(reachable_nodes,
+                   key=lambda node: (keys[node][0] - len(self.gateways_by_node[node]), keys[node][1], node))
+        return node, min(self.gateways_by_node[node])
@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from botlibs.graph.classes import SparseAdjacencyMatrix
+
+NO_NEIGHBOR = -1
+DIRECTIONS = ["N", "S", "E", "W"]
+DIRECTIONS_INDICES: Dict[str, int] = {direction: index for index, direction in enumerate(DIRECTIONS)}
+DIRECTIONS_OFFSETS: List[Tuple[int, int]] = [(0, -1), (0, 1), (1, 0), (-1, 0)]
+
+
+class GridGraph:
+    # node = x + y * width, neighbors are stored in a (nodes_number, 4) table in N, S, E, W order
+    # blocked nodes (walls, ...) keep their neighbors in the table but have no edges in or out
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.nodes_number = width * height
+
+        nodes = np.arange(self.nodes_number, dtype=np.int32)
+        self.xs, self.ys = nodes % width, nodes // width
+        self.neighbors = np.full((self.nodes_number, len(DIRECTIONS)), NO_NEIGHBOR, dtype=np.int32)
+        for direction, (dx, dy) in enumerate(DIRECTIONS_OFFSETS):
+            xs, ys = self.xs + dx, self.ys + dy
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            self.neighbors[inside, direction] = xs[inside] + ys[inside] * width
+
+        self.blocked = np.zeros(self.nodes_number, dtype=bool)
+        self._neighbors_lists: List[List[int]] = [[int(neighbor) for neighbor in row if neighbor != NO_NEIGHBOR]
+                                                  for row in self.neighbors]
+
+    def get_node(self, x: int, y: int) -> int:
+        return x + y * self.width
+
+    def get_node_coordinates(self, node: int) -> Tuple[int, int]:
+        return node % self.width, node // self.width
+
+    def get_neighbor(self, node: int, direction: str) -> Optional[int]:
+        neighbor = self.neighbors[node, DIRECTIONS_INDICES[direction]]
+        return None if neighbor == NO_NEIGHBOR else int(neighbor)
+
+    def get_neighbors(self, node: int) -> List[int]:
+        return self._neighbors_lists[node]
+
+    def block_nodes(self, nodes: Iterable[int]):
+        self.blocked[np.fromiter(nodes, dtype=np.int32)] = True
+
+    def unblock_nodes(self, nodes: Iterable[int]):
+        self.blocked[np.fromiter(nodes, dtype=np.int32)] = False
+
+    def block_mask(self, mask: np.ndarray):
+        # mask is a (height, width) array, like a map read line by line
+        self.blocked |= np.asarray(mask, dtype=bool).ravel()
+
+    def edges_mask(self) -> np.ndarray:
+        # (nodes_number, 4) mask of the existing edges between unblocked nodes
+        has_neighbor = self.neighbors != NO_NEIGHBOR
+        blocked_neighbor = self.blocked[np.where(has_neighbor, self.neighbors, 0)]
+        return has_neighbor & ~blocked_neighbor & ~self.blocked[:, None]
+
+    def create_adjacency_matrix(self, weights: Optional[np.ndarray] = None) -> SparseAdjacencyMatrix:
+        # weights are the costs to enter each node, unit weights by default
+        mask = self.edges_mask()
+        from_nodes = np.nonzero(mask)[0]
+        to_nodes = self.neighbors[mask]
+        data = np.ones(to_nodes.size) if weights is None else np.asarray(weights, dtype=float)[to_nodes]
+        sparce_matrix = csr_matrix((data, (from_nodes, to_nodes)), shape=(self.nodes_number, self.nodes_number))
+        return SparseAdjacencyMatrix(nodes_number=self.nodes_number, sparce_matrix=sparce_matrix)
@@ -0,0 +1,131 @@
+# https://en.wikipedia.org/wiki/A*_search_algorithm
+# https://en.wikipedia.org/wiki/Bidirectional_search
+
+from typing import Callable, Dict, List, Optional
+import heapq
+import math
+
+import numpy as np
+
+from botlibs.graph.classes import AdjacencyMatrix, NodesPair
+
+Heuristic = Callable[[int, int], float]
+
+
+def zero_heuristic(node: int, to_node: int) -> float:
+    return 0
+
+
+def manhattan_heuristic(width: int, min_weight: float = 1) -> Heuristic:
+    # nodes are x + y * width, like in grids : the heuristic stays admissible if no edge costs less than min_weight
+    def heuristic(node: int, to_node: int) -> float:
+        return min_weight * (abs(node % width - to_node % width) + abs(node // width - to_node // width))
+    return heuristic
+
+
+def euclidean_heuristic(width: int, min_weight: float = 1) -> Heuristic:
+    def heuristic(node: int, to_node: int) -> float:
+        return min_weight * math.hypot(node % width - to_node % width, node // width - to_node // width)
+    return heuristic
+
+
+def build_path(predecessors: Dict[int, int], from_node: int, to_node: int) -> List[int]:
+    reversed_path = [to_node]
+    while reversed_path[-1] != from_node:
+        reversed_path.append(predecessors[reversed_path[-1]])
+    return reversed_path[::-1]
+
+
+def create_nodes_pair(from_node: int, to_node: int, distance: float, path: Optional[List[int]]) -> NodesPair:
+    # same shortest path as DijkstraAlgorithm : from_node excluded, None if there is no move to do
+    if path is None:
+        return NodesPair(from_node=from_node, to_node=to_node)
+    return NodesPair(from_node=from_node, to_node=to_node, distance=distance,
+                     shortest_path=path[1:] if len(path) > 1 else None)
+
+
+class AStarSearch:
+    # single pair queries, expanded_nodes is the number of nodes settled by the last query
+    def __init__(self, adjacency_matrix: AdjacencyMatrix, heuristic: Heuristic = zero_heuristic):
+        csgraph = adjacency_matrix.sparce_matrix
+        self.indptr, self.indices, self.weights = csgraph.indptr.tolist(), csgraph.indices.tolist(), \
+            csgraph.data.tolist()
+        self.heuristic = heuristic
+        self.expanded_nodes = 0
+
+    def find_shortest_path(self, from_node: int, to_node: int) -> NodesPair:
+        indptr, indices, weights, heuristic = self.indptr, self.indices, self.weights, self.heuristic
+        dist = {from_node: 0}
+        predecessors = {}
+        settled = set()
+        heap = [(heuristic(from_node, to_node), 0, from_node)]
+        while heap:
+            _, distance, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            if node == to_node:
+                self.expanded_nodes = len(settled)
+                return create_nodes_pair(from_node, to_node, distance, build_path(predecessors, from_node, to_node))
+
+            for k in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[k]
+                neighbor_distance = distance + weights[k]
+                if neighbor not in settled and neighbor_distance < dist.get(neighbor, np.inf):
+                    dist[neighbor] = neighbor_distance
+                    predecessors[neighbor] = node
+                    heapq.heappush(heap, (neighbor_distance + heuristic(neighbor, to_node), neighbor_distance,
+                                          neighbor))
+
+        self.expanded_nodes = len(settled)
+        return create_nodes_pair(from_node, to_node, np.inf, None)
+
+
+class BidirectionalDijkstraSearch:
+    # forward search from from_node, backward search to to_node on the reversed edges
+    # it stops once the two frontiers cannot give a shorter path than the best meeting found
+    def __init__(self, adjacency_matrix: AdjacencyMatrix):
+        csgraph = adjacency_matrix.sparce_matrix
+        reversed_csgraph = csgraph.T.tocsr()
+        self.graphs = [(csgraph.indptr.tolist(), csgraph.indices.tolist(), csgraph.data.tolist()),
+                       (reversed_csgraph.indptr.tolist(), reversed_csgraph.indices.tolist(),
+                        reversed_csgraph.data.tolist())]
+        self.expanded_nodes = 0
+
+    def find_shortest_path(self, from_node: int, to_node: int) -> NodesPair:
+        if from_node == to_node:
+            self.expanded_nodes = 0
+            return create_nodes_pair(from_node, to_node, 0, [from_node])
+
+        dists = [{from_node: 0}, {to_node: 0}]
+        predecessors = [{}, {}]
+        settled = [set(), set()]
+        heaps = [[(0, from_node)], [(0, to_node)]]
+        best_distance, meeting_node = np.inf, None
+        while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best_distance:
+            # the smallest frontier is expanded
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            distance, node = heapq.heappop(heaps[side])
+            if node in settled[side]:
+                continue
+            settled[side].add(node)
+
+            indptr, indices, weights = self.graphs[side]
+            dist, other_dist = dists[side], dists[1 - side]
+            for k in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[k]
+                neighbor_distance = distance + weights[k]
+                if neighbor_distance < dist.get(neighbor, np.inf):
+                    dist[neighbor] = neighbor_distance
+                    predecessors[side][neighbor] = node
+                    heapq.heappush(heaps[side], (neighbor_distance, neighbor))
+                if neighbor in other_dist and neighbor_distance + other_dist[neighbor] < best_distance:
+                    best_distance = neighbor_distance + other_dist[neighbor]
+                    meeting_node = neighbor
+
+        self.expanded_nodes = len(settled[0]) + len(settled[1])
+        if meeting_node is None:
+            return create_nodes_pair(from_node, to_node, np.inf, None)
+        forward_path = build_path(predecessors[0], from_node, meeting_node)
+        backward_path = build_path(predecessors[1], to_node, meeting_node)
+        return create_nodes_pair(from_node, to_node, best_distance, forward_path + backward_path[::-1][1:])
@@ -0,0 +1,106 @@
+# https://en.wikipedia.org/wiki/Voronoi_diagram
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence
+import heapq
+
+import numpy as np
+
+from botlibs.graph.algorithms import neighbors_table
+from botlibs.graph.classes import AdjacencyMatrix
+
+UNREACHED = -1
+CONTESTED = -2
+
+
+@dataclass
+class Territory:
+    # owner is the index of the player reaching the node first, CONTESTED if several players reach it together
+    owners: np.ndarray
+    dist: np.ndarray
+
+    @property
+    def contested_nodes(self) -> np.ndarray:
+        return np.flatnonzero(self.owners == CONTESTED)
+
+    def get_player_nodes(self, player: int) -> np.ndarray:
+        return np.flatnonzero(self.owners == player)
+
+    def count_nodes(self) -> Dict[int, int]:
+        owners, counts = np.unique(self.owners, return_counts=True)
+        return dict(zip(owners.tolist(), counts.tolist()))
+
+
+def seed_territory(nodes_number: int, sources_by_player: Sequence[Iterable[int]]) -> Territory:
+    territory = Territory(owners=np.full(nodes_number, UNREACHED, dtype=np.int32), dist=np.full(nodes_number, np.inf))
+    for player, sources in enumerate(sources_by_player):
+        for source in sources:
+            owner = territory.owners[source]
+            territory.owners[source] = player if owner in (UNREACHED, player) else CONTESTED
+            territory.dist[source] = 0
+    return territory
+
+
+def unit_voronoi_partition(adjacency_matrix: AdjacencyMatrix, sources_by_player: Sequence[Iterable[int]]) -> Territory:
+    # all players grow together one level at a time, contested nodes stop the growth
+    table = neighbors_table(adjacency_matrix.sparce_matrix)
+    nodes_number, max_degree = table.shape
+    territory = seed_territory(nodes_number, sources_by_player)
+    owners, dist = territory.owners, territory.dist
+    players_number = len(sources_by_player)
+
+    frontier = np.flatnonzero(owners >= 0)
+    level = 0
+    while frontier.size:
+        level += 1
+        reached = table[frontier].ravel()
+        players = np.repeat(owners[frontier], max_degree)
+        unvisited = np.isinf(dist[reached])
+        reached, players = reached[unvisited], players[unvisited]
+
+        min_players = np.full(nodes_number, players_number, dtype=np.int32)
+        max_players = np.full(nodes_number, -1, dtype=np.int32)
+        np.minimum.at(min_players, reached, players)
+        np.maximum.at(max_players, reached, players)
+        reached = np.unique(reached)
+        dist[reached] = level
+        owners[reached] = np.where(min_players[reached] == max_players[reached], min_players[reached], CONTESTED)
+        frontier = reached[owners[reached] >= 0]
+    return territory
+
+
+def weighted_voronoi_partition(adjacency_matrix: AdjacencyMatrix,
+                               sources_by_player: Sequence[Iterable[int]]) -> Territory:
+    # one dijkstra for all players, a node settled at the same distance by another player becomes contested
+    # paths going through a node are dropped if the node is not owned by their player anymore
+    csgraph = adjacency_matrix.sparce_matrix
+    indptr, indices, weights = csgraph.indptr.tolist(), csgraph.indices.tolist(), csgraph.data.tolist()
+    territory = seed_territory(csgraph.shape[0], sources_by_player)
+    owners, dist = territory.owners, territory.dist
+    settled = np.isfinite(dist)
+
+    heap = [(0, int(owners[node]), node, node) for node in np.flatnonzero(owners >= 0).tolist()]
+    heapq.heapify(heap)
+    while heap:
+        distance, player, node, parent = heapq.heappop(heap)
+        if owners[parent] != player:
+            continue
+        if node != parent:
+            if settled[node]:
+                if distance == dist[node] and owners[node] not in (player, CONTESTED):
+                    owners[node] = CONTESTED
+                continue
+            settled[node] = True
+            dist[node] = distance
+            owners[node] = player
+        for k in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[k]
+            if not settled[neighbor] or distance + weights[k] == dist[neighbor]:
+                heapq.heappush(heap, (distance + weights[k], player, neighbor, node))
+    return territory
+
+
+def voronoi_partition(adjacency_matrix: AdjacencyMatrix, sources_by_player: Sequence[Iterable[int]]) -> Territory:
+    if np.all(adjacency_matrix.sparce_matrix.data == 1):
+        return unit_voronoi_partition(adjacency_matrix, sources_by_player)
+    return weighted_voronoi_partition(adjacency_matrix, sources_by_player)
@@ -1,31 +1,32 @@
 import math
+from operator import itemgetter
 from typing import Dict, Callable, Any
 
 import numpy as np
 
 
-class Point:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
+class PointOperations:
+    # shared by the mutable (slots) and frozen (tuple) points, results stay in the family of the left operand
+    # each family gives its types by properties, so that an unused family stays dead code when built
+    __slots__ = ()
 
     def __eq__(self, other):
         return (self.x == other.x) and (self.y == other.y)
 
     def __add__(self, other):
-        if isinstance(other, Point):
-            return Vector(self.x + other.x, self.y + other.y)
+        if isinstance(other, PointOperations):
+            return self.vector_type(self.x + other.x, self.y + other.y)
         else:
-            return Point(self.x + other.x, self.y + other.y)
+            return self.point_type(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other):
-        if isinstance(other, Point):
-            return Vector(self.x - other.x, self.y - other.y)
+        if isinstance(other, PointOperations):
+            return self.vector_type(self.x - other.x, self.y - other.y)
         else:
-            return Point(self.x - other.x, self.y - other.y)
+            return self.point_type(self.x - other.x, self.y - other.y)
 
     def __mul__(self, nombre):
-        return Point(nombre * self.x, nombre * self.y)
+        return self.point_type(nombre * self.x, nombre * self.y)
 
     def __rmul__(self, nombre):
         return self * nombre
@@ -34,21 +35,20 @@ class Point:
         return (self.x, self.y).__hash__()
 
     def __round__(self, n=None):
-        return Point(round(self.x, n), round(self.y, n))
+        return self.point_type(round(self.x, n), round(self.y, n))
 
     def dist(self, point):
-        return math.dist([self.x, self.y], [point.x, point.y])
+        return math.hypot(self.x - point.x, self.y - point.y)
 
 
-class Vector(Point):
-    def __init__(self, x, y):
-        super().__init__(x, y)
+class VectorOperations(PointOperations):
+    __slots__ = ()
 
     def __mul__(self, nombre):
-        return Vector(nombre * self.x, nombre * self.y)
+        return self.vector_type(nombre * self.x, nombre * self.y)
 
     def __round__(self, n=None):
-        return Vector(round(self.x, n), round(self.y, n))
+        return self.vector_type(round(self.x, n), round(self.y, n))
 
     def dot(self, vector):
         return self.x * vector.x + self.y * vector.y
@@ -62,6 +62,69 @@ class Vector(Point):
         return math.sqrt(self.norm2)
 
 
+class Point(PointOperations):
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    @property
+    def point_type(self):
+        return Point
+
+    @property
+    def vector_type(self):
+        return Vector
+
+    # in place operators keep the point type and do not allocate, beware of the other references to the point
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other):
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, nombre):
+        self.x *= nombre
+        self.y *= nombre
+        return self
+
+
+class Vector(VectorOperations, Point):
+    __slots__ = ()
+
+
+class FrozenPoint(PointOperations, tuple):
+    # hashable and immutable, usable as dict keys, + - * always return new frozen points
+    __slots__ = ()
+
+    def __new__(cls, x, y):
+        return tuple.__new__(cls, (x, y))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    x = property(itemgetter(0))
+    y = property(itemgetter(1))
+    __hash__ = tuple.__hash__
+
+    @property
+    def point_type(self):
+        return FrozenPoint
+
+    @property
+    def vector_type(self):
+        return FrozenVector
+
+
+class FrozenVector(VectorOperations, FrozenPoint):
+    __slots__ = ()
+
+
 class VectorHashMap:
     def __init__(self, func_to_cache: Callable[[Vector], Any]):
         self.hasp_map: Dict[int, Any] = {}
@@ -20,7 +20,9 @@ class Entity:
             self.x = target.x
             self.y = target.y
         else:
-            next_position = self.position + (self.speed / distance_to_target) * vector_to_target
+            vector_to_target *= self.speed / distance_to_target
+            next_position = self.position
+            next_position += vector_to_target
             self.x = next_position.x
             self.y = next_position.y
 
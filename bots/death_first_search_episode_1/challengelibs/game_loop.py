@@ -1,4 +1,3 @@
-import random
 import sys
 from typing import List
 
@@ -52,4 +51,5 @@ class GameLoop:
                         played = True
                         break
             if not played:
-                self.network.cut(random.choice(list(self.network.links)))
+                link = self.network.get_most_dangerous_link(si)
+                self.network.cut(link if link is not None else next(iter(self.network.links)))
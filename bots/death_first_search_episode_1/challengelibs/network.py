@@ -1,8 +1,9 @@
-from typing import Set, List
+from typing import Set, List, Optional
 from dataclasses import dataclass
 
 from botlibs.graph.classes import Edge
 from botlibs.graph.create import create_adjacency_list_from_edges
+from botlibs.graph.flow import DangerousLinksScorer
 
 
 class Link(Edge):
@@ -21,9 +22,11 @@ class Network:
 
     def __post_init__(self):
         self.adjacency_list = create_adjacency_list_from_edges(self.links)
+        self.dangerous_links_scorer = DangerousLinksScorer(self.adjacency_list, self.gateways)
 
     def cut(self, link: Link):
         self.adjacency_list.remove_edge(link)
+        self.dangerous_links_scorer.cut(link.from_node, link.to_node)
         try:
             self.links.remove(link)
         except KeyError:
@@ -32,3 +35,7 @@ class Network:
 
     def get_node_neighbours(self, node):
         return list(self.adjacency_list[node])
+
+    def get_most_dangerous_link(self, agent_node: int) -> Optional[Link]:
+        nodes = self.dangerous_links_scorer.most_dangerous_link(agent_node)
+        return Link(*nodes) if nodes else None
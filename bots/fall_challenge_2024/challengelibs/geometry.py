@@ -3,6 +3,7 @@ from dataclasses import dataclass, field
 import numpy as np
 
 from botlibs.graph.classes import AdjacencyMatrix, AdjacencyList, Edge
+from botlibs.graph.grid import GridGraph, NO_NEIGHBOR
 from bots.fall_challenge_2024.challengelibs.assets import Coordinates
 
 
@@ -47,10 +48,10 @@ class Grid:
     nb_nodes: int = field(init=False)
     nodes_coordinates: list[Coordinates] = field(init=False)
     nodes_matrix: np.ndarray = field(init=False)
+    grid_graph: GridGraph = field(init=False)
+    nodes_frontiers: list[NodeFrontier] = field(init=False)
     adjacency_matrix: AdjacencyMatrix = field(init=False)
     adjacency_list: AdjacencyList = field(init=False)
-    initial_adjacency_matrix: AdjacencyMatrix = field(init=False)
-    initial_adjacency_list: AdjacencyList = field(init=False)
 
     def __post_init__(self):
         self.nb_nodes = self.width * self.height
@@ -65,20 +66,29 @@ class Grid:
             self.nodes_coordinates.append(Coordinates(x=x, y=y))
             self.nodes_matrix[x, y] = node
 
-        self.adjacency_matrix = AdjacencyMatrix(np.zeros((self.nb_nodes, self.nb_nodes), dtype=int))
-        self.adjacency_list = AdjacencyList({})
+        # frontiers are computed once from the neighbors table, they must not be modified
+        self.grid_graph = GridGraph(width=self.width, height=self.height)
+        self.nodes_frontiers = []
+        for node, neighbors in enumerate(self.grid_graph.neighbors.tolist()):
+            # neighbors are in N, S, E, W order
+            north, south, east, west = [None if neighbor == NO_NEIGHBOR else neighbor for neighbor in neighbors]
+            self.nodes_frontiers.append(NodeFrontier(node, north=north, south=south, east=east, west=west))
 
+        self.adjacency_matrix = self.grid_graph.create_adjacency_matrix()
+        self.adjacency_list = AdjacencyList({})
         for node in range(self.nb_nodes):
-            cardinal_nodes = self.get_node_frontier(node).cardinal_nodes
-            for cardinal_node in cardinal_nodes:
-                self.connect_nodes(from_node=node, to_node=cardinal_node)
+            for cardinal_node in self.get_node_frontier(node).cardinal_nodes:
+                self.adjacency_list.add_edge(Edge(from_node=node, to_node=cardinal_node))
 
-        self.initial_adjacency_matrix = self.adjacency_matrix.copy()
-        self.initial_adjacency_list = self.adjacency_list.copy()
+        # changes of a turn are rolled back to this initial state
+        self.adjacency_matrix.checkpoint()
+        self.adjacency_list.checkpoint()
 
     def new_turn(self):
-        self.adjacency_matrix = self.initial_adjacency_matrix.copy()
-        self.adjacency_list = self.initial_adjacency_list.copy()
+        self.adjacency_matrix.rollback()
+        self.adjacency_list.rollback()
+        self.adjacency_matrix.checkpoint()
+        self.adjacency_list.checkpoint()
 
     def get_node(self, coordinates: Coordinates) -> int:
         x, y = coordinates
@@ -87,28 +97,8 @@ class Grid:
     def get_node_coordinates(self, node: int):
         return self.nodes_coordinates[node]
 
-    def get_node_frontier(self, node: int):
-        node_frontier = NodeFrontier(node)
-
-        x, y = self.get_node_coordinates(node)
-
-        if y >= 1:
-            node_north = self.get_node(Coordinates(x, y - 1))
-            node_frontier.north = node_north
-
-        if x >= 1:
-            node_west = self.get_node(Coordinates(x - 1, y))
-            node_frontier.west = node_west
-
-        if x < self.width - 1:
-            node_east = self.get_node(Coordinates(x + 1, y))
-            node_frontier.east = node_east
-
-        if y < self.height - 1:
-            node_south = self.get_node(Coordinates(x, y + 1))
-            node_frontier.south = node_south
-
-        return node_frontier
+    def get_node_frontier(self, node: int) -> NodeFrontier:
+        return self.nodes_frontiers[node]
 
     def connect_nodes(self, from_node: int, to_node: int, directed: bool = False, weight: float = 1):
         edge = Edge(from_node=from_node,
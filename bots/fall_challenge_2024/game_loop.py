@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from botlibs.graph.algorithms import DijkstraAlgorithm
 from bots.fall_challenge_2024.challengelibs.assets import Entities, Coordinates, Entity, ProteinStock
@@ -12,7 +12,7 @@ class GameLoop:
     __slots__ = ("init_inputs", "nb_turns", "turns_inputs", "width", "height", "nb_entities", "entities",
                  "my_protein_stock", "opp_protein_stock",
                  "required_actions_count", "grid", "create_new_root",
-                 "actions")
+                 "actions", "dijkstra_algorithm")
 
     RUNNING = True
     LOG = True
@@ -23,6 +23,7 @@ class GameLoop:
         self.nb_turns: int = 0
         self.turns_inputs: List[str] = []
         self.actions: list[str] = []
+        self.dijkstra_algorithm: Optional[DijkstraAlgorithm] = None
 
         self.width, self.height = [int(i) for i in self.get_init_input().split()]
         self.nb_entities: int = 0
@@ -164,9 +165,14 @@ class GameLoop:
                 for neighbour in neighbours:
                     neighbours_opp_organs[neighbour] = opp_organ
 
+            # shortest paths are only computed from my organs, the ones of the previous turn are repaired
             dijkstra_algorithm = DijkstraAlgorithm(
-                adjacency_matrix=self.grid.adjacency_matrix
+                adjacency_matrix=self.grid.adjacency_matrix,
+                previous=self.dijkstra_algorithm,
+                lazy=True,
+                cache_paths=True
             )
+            self.dijkstra_algorithm = dijkstra_algorithm
 
             # TODO : REPRODUCTION strategy if proteins harvest / stock is enough ?
             strategies = {
@@ -208,13 +214,12 @@ class GameLoop:
                     priority=2
                 )
 
-                actions_by_strategy = {}
-                for strategy in strategies.values():
-                    closest_organ_target_pair = dijkstra_algorithm.find_closest_nodes_pair(
-                        from_nodes=my_organs,
-                        to_nodes=strategy.targets
-                    )
+                closest_organ_target_pairs = dijkstra_algorithm.find_closest_nodes_pairs(
+                    [(my_organs, strategy.targets) for strategy in strategies.values()]
+                )
 
+                actions_by_strategy = {}
+                for strategy, closest_organ_target_pair in zip(strategies.values(), closest_organ_target_pairs):
                     real_target = closest_organ_target_pair.to_node
                     if real_target is not None and strategy.objective == Objective.ATTACK:
                         real_target = neighbours_opp_organs[real_target]
@@ -239,3 +244,6 @@ class GameLoop:
                     strategy.targets.remove(to_node)
 
                 print(action)
+
+            if GameLoop.LOG:
+                log(f"dijkstra rows recomputed: {dijkstra_algorithm.recomputed_rows}/{self.grid.nb_nodes}")
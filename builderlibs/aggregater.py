@@ -1,52 +1,140 @@
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 import ast
+import hashlib
 
 from .logger import Logger
 from builderlibs.fileutils import PythonFile
-from builderlibs.dependencies import LocalModule, Import, ImportFrom, Module
-from .optimizer import ImportNodesRemover, add_nodes_at_the_beginning, optimize_imports_nodes, UsedVisitor, UnusedRemover
+from builderlibs.dependencies import LocalModule, Import, Module, ImportResolutionIndex
+from builderlibs.cache import BuildCache, ResolvedImport, NodePath, PARSE_CACHE
+from .optimizer import (ImportNodesRemover, add_nodes_at_the_beginning, optimize_imports_nodes, remove_dead_code,
+                        fold_constants, flatten_modules, make_imports_lazy)
+from .profiler import instrument_startup
 
 logger = Logger().get()
 
 
+def find_local_module(name: str, level: int, from_paths: List[Path],
+                      index: Optional[ImportResolutionIndex] = None) -> Optional[Module]:
+    for from_path in from_paths:
+        module = Module(name=name, imported_from=from_path, level=level, index=index)
+        if module.is_local:
+            return module
+    return None
+
+
+def resolve_imports(imports: List[ResolvedImport], from_paths: List[Path],
+                    index: ImportResolutionIndex) -> Optional[List[Optional[Module]]]:
+    # None if any import doesn't resolve to its cached target anymore
+    modules = []
+    for name, level, target in imports:
+        local_module = find_local_module(name=name, level=level, from_paths=from_paths, index=index)
+        if (str(local_module.target) if local_module else None) != target:
+            return None
+        modules.append(local_module)
+    return modules
+
+
+def find_import_from_paths(tree: ast.AST, path: Optional[NodePath] = None) -> List[NodePath]:
+    # same depth first order as NodeTransformer.generic_visit, statements are always in lists
+    paths = []
+    path = path or []
+    for field, value in ast.iter_fields(tree):
+        if not isinstance(value, list):
+            continue
+        for i, node in enumerate(value):
+            if isinstance(node, ast.ImportFrom):
+                paths.append(path + [(field, i)])
+            elif isinstance(node, ast.AST):
+                paths.extend(find_import_from_paths(node, path + [(field, i)]))
+    return paths
+
+
 class LocalModuleReplacer(ast.NodeTransformer):
     def __init__(self, main_module: LocalModule, local_packages_paths: List[Path] = [],
-                 local_modules_replaced: List[Module] = []):
+                 local_modules_replaced: List[Module] = [], build_cache: Optional[BuildCache] = None,
+                 index: Optional[ImportResolutionIndex] = None):
         super().__init__()
         self._main_module = main_module
         self._local_packages_paths = local_packages_paths
         self._local_modules_replaced = local_modules_replaced
+        self._build_cache = build_cache
+        self._index = index if index is not None else ImportResolutionIndex()
+        self._resolved_imports: List[ResolvedImport] = []
 
     @property
     def from_paths(self):
         return [self._main_module.file_path] + self._local_packages_paths
 
+    @property
+    def resolved_imports(self) -> List[ResolvedImport]:
+        return self._resolved_imports
+
+    def replace(self) -> ast.Module:
+        file_path = self._main_module.file_path
+        if self._build_cache is None:
+            return self.visit(self._main_module.tree)
+
+        # an unchanged module resolving its imports as cached isn't visited again, its local imports are
+        # replaced at their cached paths
+        tree = self._build_cache.load_tree(file_path)
+        entry = self._build_cache.get_entry(file_path)
+        if entry is not None and entry.imports_paths is not None:
+            imported_modules = resolve_imports(entry.imports, self.from_paths, self._index)
+            if imported_modules is not None:
+                self._resolved_imports = entry.imports
+                return self._replace_at_paths(tree, entry.imports_paths, imported_modules)
+
+        self._build_cache.reprocessed += 1
+        imports_paths = find_import_from_paths(tree)
+        tree = self.visit(tree)
+        self._build_cache.update_imports(file_path, self._resolved_imports, imports_paths)
+        return tree
+
+    def _replace_at_paths(self, tree: ast.Module, imports_paths: List[NodePath],
+                          imported_modules: List[Optional[Module]]) -> ast.Module:
+        for path, imported_module in zip(imports_paths, imported_modules):
+            if imported_module is None:
+                continue
+            parent = tree
+            for field, i in path[:-1]:
+                parent = getattr(parent, field)[i]
+            field, i = path[-1]
+            getattr(parent, field)[i] = self._replace_local_module(imported_module)
+        return tree
+
     def visit_ImportFrom(self, node: ast.ImportFrom) -> Union[ast.ImportFrom, ast.Module]:
-        for from_path in self.from_paths:
-            imported_module = ImportFrom(node=node, from_path=from_path).modules[0]
-            if imported_module.is_local:
-                if imported_module not in self._local_modules_replaced:
-                    self._local_modules_replaced.append(imported_module)
+        imported_module = find_local_module(name=node.module, level=node.level, from_paths=self.from_paths,
+                                            index=self._index)
+        if imported_module is None:
+            self._resolved_imports.append((node.module, node.level, None))
+            return node
 
-                    target_path = imported_module.target
-                    target_module_file = PythonFile(target_path)
-                    local_module_to_import = LocalModule(target_module_file)
+        self._resolved_imports.append((node.module, node.level, str(imported_module.target)))
+        return ast.fix_missing_locations(self._replace_local_module(imported_module))
 
-                    replacer = LocalModuleReplacer(main_module=local_module_to_import,
-                                                   local_packages_paths=self._local_packages_paths,
-                                                   local_modules_replaced=self._local_modules_replaced)
+    def _replace_local_module(self, imported_module: Module) -> ast.Module:
+        if imported_module in self._local_modules_replaced:
+            return ast.Module(body=[], type_ignores=[])
+        self._local_modules_replaced.append(imported_module)
 
-                    logger.info(f"Module {imported_module.name} imported from file at {target_path}")
+        target_path = imported_module.target
+        target_module_file = PythonFile(target_path)
+        local_module_to_import = LocalModule(target_module_file)
 
-                    return ast.fix_missing_locations(replacer.visit(local_module_to_import.tree))
-                else:
-                    return ast.Module(body=[], type_ignores=[])
-        return node
+        replacer = LocalModuleReplacer(main_module=local_module_to_import,
+                                       local_packages_paths=self._local_packages_paths,
+                                       local_modules_replaced=self._local_modules_replaced,
+                                       build_cache=self._build_cache,
+                                       index=self._index)
+
+        logger.info(f"Module {imported_module.name} imported from file at {target_path}")
+
+        return replacer.replace()
 
     def visit_Import(self, node: ast.Import):
         for from_path in self.from_paths:
-            imported_modules = Import(node=node, from_path=from_path).modules
+            imported_modules = Import(node=node, from_path=from_path, index=self._index).modules
             for module in imported_modules:
                 if module.is_local:
                     raise ValueError(f"Statement import for local module not supported. Please use from ... import ... "
@@ -55,13 +143,23 @@ class LocalModuleReplacer(ast.NodeTransformer):
 
 
 class ModuleAggregater:
-    def __init__(self, main_module: LocalModule, local_packages_paths: List[Path] = []):
+    def __init__(self, main_module: LocalModule, local_packages_paths: List[Path] = [],
+                 build_cache: Optional[BuildCache] = None, aggressive: bool = False, profile_startup: bool = False,
+                 lazy_imports: Optional[List[str]] = None):
         self._main_module = main_module
-        self._replacer = LocalModuleReplacer(main_module, local_packages_paths)
+        self._local_packages_paths = local_packages_paths
+        self._build_cache = build_cache
+        self._aggressive = aggressive
+        self._profile_startup = profile_startup
+        self._lazy_imports = lazy_imports or []
+        # scanned once per build : modules resolution doesn't probe the filesystem anymore
+        self._index = ImportResolutionIndex(roots=[main_module.file_path.parent] + local_packages_paths)
+        self._replacer = LocalModuleReplacer(main_module, local_packages_paths, local_modules_replaced=[],
+                                             build_cache=build_cache, index=self._index)
 
     def aggregate(self) -> ast.AST:
         # TODO : separate aggregation steps
-        aggregated_tree_raw = self._replacer.visit(self._main_module.tree)
+        aggregated_tree_raw = flatten_modules(self._replacer.replace())
 
         imports_nodes_remover = ImportNodesRemover()
         aggregated_tree_no_imports = imports_nodes_remover.visit(aggregated_tree_raw)
@@ -69,14 +167,66 @@ class ModuleAggregater:
         aggregated_tree_imports_optimized = add_nodes_at_the_beginning(tree=aggregated_tree_no_imports,
                                                                        nodes=imports_nodes_optimized)
 
-        aggregated_tree_cleaned = aggregated_tree_imports_optimized
-        for _ in range(2):
-            unused_visitor = UsedVisitor()
-            unused_visitor.visit(aggregated_tree_cleaned)
-            unused_remover = UnusedRemover(unused_visitor.used_functions_and_classes)
-            aggregated_tree_cleaned = unused_remover.visit(ast.fix_missing_locations(aggregated_tree_cleaned))
+        aggregated_tree_folded = fold_constants(aggregated_tree_imports_optimized)
+        aggregated_tree_cleaned = remove_dead_code(aggregated_tree_folded, aggressive=self._aggressive)
+        aggregated_tree_cleaned = make_imports_lazy(aggregated_tree_cleaned, lazy_modules=self._lazy_imports)
+        if self._profile_startup:
+            aggregated_tree_cleaned = instrument_startup(aggregated_tree_cleaned)
 
         return ast.fix_missing_locations(aggregated_tree_cleaned)
 
+    @property
+    def options(self) -> dict:
+        return {"aggressive": self._aggressive, "profile_startup": self._profile_startup,
+                "lazy_imports": self._lazy_imports}
+
+    def build_key(self) -> Optional[str]:
+        # None if any module of the import graph is not cached, has changed or resolves its imports differently
+        modules_hashes = []
+        files_to_visit = [self._main_module.file_path]
+        visited_files = set()
+        while files_to_visit:
+            file_path = files_to_visit.pop()
+            if file_path in visited_files:
+                continue
+            visited_files.add(file_path)
+
+            entry = self._build_cache.get_entry(file_path)
+            if entry is None or entry.imports is None:
+                return None
+            modules_hashes.append(f"{file_path}:{entry.content_hash}")
+
+            imported_modules = resolve_imports(entry.imports, [file_path] + self._local_packages_paths, self._index)
+            if imported_modules is None:
+                return None
+            files_to_visit.extend(PythonFile(local_module.target).path for local_module in imported_modules
+                                  if local_module is not None)
+
+        digest = hashlib.sha1(self._build_cache.builder_hash.encode())
+        digest.update(repr([str(path) for path in self._local_packages_paths]).encode())
+        digest.update(repr(self.options).encode())
+        digest.update(repr(sorted(modules_hashes)).encode())
+        return digest.hexdigest()
+
     def aggregate_to_source(self) -> str:
-        return ast.unparse(self.aggregate())
+        if self._build_cache is None:
+            source = ast.unparse(self.aggregate())
+            logger.info(f"Parse cache: {PARSE_CACHE.hits} hits, {PARSE_CACHE.misses} misses")
+            return source
+
+        main_file_path = self._main_module.file_path
+        build_key = self.build_key()
+        source = self._build_cache.get_output(main_file_path, build_key) if build_key else None
+        if source is not None:
+            logger.info(f"Build of {main_file_path} loaded from cache at {self._build_cache.directory}")
+            return source
+
+        source = ast.unparse(self.aggregate())
+        self._build_cache.save()
+        logger.info(f"Build cache: {self._build_cache.hits} modules reused, {self._build_cache.misses} parsed, "
+                    f"{self._build_cache.reprocessed} reprocessed")
+
+        build_key = self.build_key()
+        if build_key:
+            self._build_cache.set_output(main_file_path, build_key, source)
+        return source
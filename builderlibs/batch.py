@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Optional
+import time
+
+from builderlibs.cache import BuildCache, PARSE_CACHE
+from builderlibs.challenge import ChallengeFolder, CHALLENGE_MAIN_FILE_NAME
+from builderlibs.packer import pack_source, SOURCE_FORMAT
+
+
+@dataclass
+class ChallengeBuild:
+    name: str
+    duration: float
+    error: Optional[str] = None
+    size: Optional[int] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def find_challenges(parent: Path) -> List[str]:
+    return sorted(main_file.parent.name for main_file in Path(parent).glob(f"*/{CHALLENGE_MAIN_FILE_NAME}.py"))
+
+
+def build_challenge(name: str, parent: Path, local_packages_paths: List[Path],
+                    cache_directory: Optional[Path] = None, aggressive: bool = False,
+                    format: str = SOURCE_FORMAT, profile_startup: bool = False,
+                    lazy_imports: Optional[List[str]] = None, use_cache: bool = True) -> ChallengeBuild:
+    start = time.perf_counter()
+    parse_cache_enabled, PARSE_CACHE.enabled = PARSE_CACHE.enabled, use_cache
+    try:
+        build_cache = BuildCache(directory=cache_directory) if cache_directory and use_cache else None
+        challenge_source = ChallengeFolder(name=name, parent=parent).aggregate_to_source(
+            local_packages_paths=local_packages_paths,
+            build_cache=build_cache,
+            aggressive=aggressive,
+            profile_startup=profile_startup,
+            lazy_imports=lazy_imports
+        )
+        packed_source = pack_source(challenge_source, format=format)
+        with open(parent / f"{name}_built.py", "w") as f:
+            f.write(packed_source.source)
+    except Exception as e:
+        return ChallengeBuild(name=name, duration=time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+    finally:
+        PARSE_CACHE.enabled = parse_cache_enabled
+    return ChallengeBuild(name=name, duration=time.perf_counter() - start, size=len(packed_source.source))
+
+
+def build_challenges(names: List[str], parent: Path, local_packages_paths: List[Path],
+                     cache_directory: Optional[Path] = None, max_workers: Optional[int] = None,
+                     aggressive: bool = False, format: str = SOURCE_FORMAT,
+                     profile_startup: bool = False, lazy_imports: Optional[List[str]] = None,
+                     use_cache: bool = True) -> List[ChallengeBuild]:
+    with TemporaryDirectory() as tmp_directory:
+        # shared libs are parsed once here, workers load them from the cache
+        if use_cache:
+            cache_directory = cache_directory or Path(tmp_directory)
+            BuildCache(directory=cache_directory).warm(local_packages_paths)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(build_challenge, name, parent, local_packages_paths, cache_directory,
+                                       aggressive, format, profile_startup, lazy_imports, use_cache)
+                       for name in names]
+            return [future.result() for future in futures]
+
+
+def format_builds_summary(builds: List[ChallengeBuild], total_duration: float) -> str:
+    name_width = max([len(build.name) for build in builds] + [len("total")])
+    lines = []
+    for build in builds:
+        status = f"ok ({build.size} bytes)" if build.succeeded else f"FAILED ({build.error})"
+        lines.append(f"{build.name:<{name_width}}  {1000 * build.duration:>9.1f}ms  {status}")
+    nb_failed = len([build for build in builds if not build.succeeded])
+    lines.append(f"{'total':<{name_width}}  {1000 * total_duration:>9.1f}ms  {len(builds) - nb_failed} built, "
+                 f"{nb_failed} failed")
+    return "\n".join(lines)
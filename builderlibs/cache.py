@@ -0,0 +1,211 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import ast
+import hashlib
+import os
+import pickle
+import sys
+
+from .logger import Logger
+
+logger = Logger().get()
+
+
+BUILDERLIBS_PATH = Path(__file__).parent.resolve()
+BUILD_CACHE_VERSION = 1
+
+# (module name, level, resolved target) for each "from ... import ..." statement of a module
+ResolvedImport = Tuple[str, int, Optional[str]]
+# (field name, index) steps from a module tree to one of its statements
+NodePath = List[Tuple[str, int]]
+
+
+def hash_bytes(content: bytes) -> str:
+    return hashlib.sha1(content).hexdigest()
+
+
+def hash_path(path: Path) -> str:
+    return hash_bytes(str(path).encode())
+
+
+def compute_builder_hash() -> str:
+    # built sources depend on the builder code itself and on the python version (ast.unparse)
+    digest = hashlib.sha1(f"{BUILD_CACHE_VERSION}/{sys.version}".encode())
+    for path in sorted(BUILDERLIBS_PATH.glob("*.py")):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+@dataclass
+class ParsedModule:
+    mtime_ns: int
+    size: int
+    tree: ast.Module
+    tree_dump: bytes
+
+
+class ParseCache:
+    # unpickling a dump is ~4 times faster than copy.deepcopy to give each caller its own tree
+    # a disabled cache parses the file on each call, to rule out stale trees
+    def __init__(self):
+        self._parsed_modules: Dict[Path, ParsedModule] = {}
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+
+    def get_tree(self, file_path: Path, copy: bool = True) -> ast.Module:
+        if not self.enabled:
+            self.misses += 1
+            with open(file_path, 'r') as f:
+                return ast.parse(f.read())
+
+        stat = os.stat(file_path)
+        parsed_module = self._parsed_modules.get(file_path)
+        if parsed_module is not None and (parsed_module.mtime_ns, parsed_module.size) == (stat.st_mtime_ns,
+                                                                                          stat.st_size):
+            self.hits += 1
+        else:
+            self.misses += 1
+            with open(file_path, 'r') as f:
+                tree = ast.parse(f.read())
+            parsed_module = ParsedModule(mtime_ns=stat.st_mtime_ns, size=stat.st_size, tree=tree,
+                                         tree_dump=pickle.dumps(tree))
+            self._parsed_modules[file_path] = parsed_module
+        return pickle.loads(parsed_module.tree_dump) if copy else parsed_module.tree
+
+    def clear(self) -> None:
+        self._parsed_modules.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+PARSE_CACHE = ParseCache()
+
+
+@dataclass
+class ModuleCacheEntry:
+    content_hash: str
+    tree_dump: bytes
+    imports: Optional[List[ResolvedImport]] = None
+    # path of each "from ... import ..." statement of the tree, in the imports order
+    imports_paths: Optional[List[NodePath]] = None
+
+    @property
+    def tree(self) -> ast.Module:
+        return pickle.loads(self.tree_dump)
+
+
+@dataclass
+class OutputCacheEntry:
+    build_key: str
+    source: str
+
+
+class BuildCache:
+    def __init__(self, directory: Path):
+        self._directory = Path(directory)
+        self._entries: Dict[Path, Optional[ModuleCacheEntry]] = {}
+        self._content_hashes: Dict[Path, Optional[str]] = {}
+        self._updated_entries: Set[Path] = set()
+        self._builder_hash: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.reprocessed = 0
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def builder_hash(self) -> str:
+        if self._builder_hash is None:
+            self._builder_hash = compute_builder_hash()
+        return self._builder_hash
+
+    def _module_entry_path(self, file_path: Path) -> Path:
+        return self._directory / "modules" / f"{hash_path(file_path)}.pickle"
+
+    def _output_entry_path(self, file_path: Path) -> Path:
+        return self._directory / "outputs" / f"{hash_path(file_path)}.pickle"
+
+    @staticmethod
+    def _load_pickle(path: Path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, AttributeError, pickle.UnpicklingError) as e:
+            logger.info(f"Build cache entry at {path} ignored: {e}")
+            return None
+
+    @staticmethod
+    def _dump_pickle(path: Path, content) -> None:
+        # atomic replace : concurrent builds may read the entry while it is written
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(content, f)
+        os.replace(tmp_path, path)
+
+    def content_hash(self, file_path: Path) -> Optional[str]:
+        if file_path not in self._content_hashes:
+            try:
+                with open(file_path, 'rb') as f:
+                    self._content_hashes[file_path] = hash_bytes(f.read())
+            except FileNotFoundError:
+                self._content_hashes[file_path] = None
+        return self._content_hashes[file_path]
+
+    def get_entry(self, file_path: Path) -> Optional[ModuleCacheEntry]:
+        if file_path not in self._entries:
+            self._entries[file_path] = self._load_pickle(self._module_entry_path(file_path))
+        entry = self._entries[file_path]
+        if entry is None or entry.content_hash != self.content_hash(file_path):
+            return None
+        return entry
+
+    def load_tree(self, file_path: Path) -> ast.Module:
+        entry = self.get_entry(file_path)
+        if entry is not None:
+            self.hits += 1
+            return entry.tree
+
+        self.misses += 1
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        tree = ast.parse(content)
+        self._content_hashes[file_path] = hash_bytes(content)
+        self._entries[file_path] = ModuleCacheEntry(content_hash=self._content_hashes[file_path],
+                                                    tree_dump=pickle.dumps(tree))
+        self._updated_entries.add(file_path)
+        return tree
+
+    def update_imports(self, file_path: Path, imports: List[ResolvedImport], imports_paths: List[NodePath]) -> None:
+        entry = self.get_entry(file_path)
+        if entry is not None and (entry.imports, entry.imports_paths) != (imports, imports_paths):
+            entry.imports = imports
+            entry.imports_paths = imports_paths
+            self._updated_entries.add(file_path)
+
+    def get_output(self, file_path: Path, build_key: str) -> Optional[str]:
+        entry: Optional[OutputCacheEntry] = self._load_pickle(self._output_entry_path(file_path))
+        if entry is None or entry.build_key != build_key:
+            return None
+        return entry.source
+
+    def set_output(self, file_path: Path, build_key: str, source: str) -> None:
+        self._dump_pickle(self._output_entry_path(file_path), OutputCacheEntry(build_key=build_key, source=source))
+
+    def save(self) -> None:
+        for file_path in self._updated_entries:
+            self._dump_pickle(self._module_entry_path(file_path), self._entries[file_path])
+        self._updated_entries.clear()
+
+    def warm(self, directories: List[Path]) -> None:
+        for directory in directories:
+            for file_path in sorted(Path(directory).resolve().rglob("*.py")):
+                self.load_tree(file_path)
+        self.save()
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from builderlibs.fileutils import Node, Directory, PythonFile
 from builderlibs.dependencies import LocalModule
 from builderlibs.aggregater import ModuleAggregater
+from builderlibs.cache import BuildCache
 
 
 CHALLENGE_MAIN_FILE_NAME = "bot"
@@ -83,5 +84,9 @@ class ChallengeFolder:
         if destroy:
             [node.destroy() for node in self._challenge_structure.nodes]
 
-    def aggregate_to_source(self, local_packages_paths: List[Path] = []) -> str:
-        return ModuleAggregater(main_module=self.main_module, local_packages_paths=local_packages_paths).aggregate_to_source()
+    def aggregate_to_source(self, local_packages_paths: List[Path] = [], build_cache: Optional[BuildCache] = None,
+                            aggressive: bool = False, profile_startup: bool = False,
+                            lazy_imports: Optional[List[str]] = None) -> str:
+        return ModuleAggregater(main_module=self.main_module, local_packages_paths=local_packages_paths,
+                                build_cache=build_cache, aggressive=aggressive,
+                                profile_startup=profile_startup, lazy_imports=lazy_imports).aggregate_to_source()
@@ -0,0 +1,14 @@
+from pathlib import Path
+
+import yaml
+
+
+BUILD_CONFIG_FILE_PATH = Path(__file__).parent / "conf" / "build.yaml"
+
+
+def build_config_from_yaml(path: Path = BUILD_CONFIG_FILE_PATH) -> dict:
+    with open(path, 'r') as f:
+        return yaml.safe_load(f.read())
+
+
+BUILD_CONFIG = build_config_from_yaml()
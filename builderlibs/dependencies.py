@@ -1,9 +1,64 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 import ast
+import os
 
 from builderlibs.fileutils import PythonFile
+from builderlibs.cache import PARSE_CACHE
+
+
+class ImportResolutionIndex:
+    IGNORED_DIRECTORIES = ["__pycache__"]
+
+    def __init__(self, roots: List[Path] = []):
+        self._directories_entries: Dict[str, FrozenSet[str]] = {}
+        self._real_paths: Dict[str, Path] = {}
+        self._resolutions: Dict[Tuple[str, str, int], Optional[Path]] = {}
+        for root in roots:
+            self.scan(root)
+
+    def scan(self, root: Path) -> None:
+        for directory, directories_names, files_names in os.walk(os.path.abspath(root)):
+            self._directories_entries[directory] = frozenset(directories_names + files_names)
+            directories_names[:] = [name for name in directories_names if name not in self.IGNORED_DIRECTORIES]
+
+    def _directory_entries(self, directory: str) -> FrozenSet[str]:
+        # directories outside of the scanned roots are listed once, on first lookup
+        if directory not in self._directories_entries:
+            try:
+                self._directories_entries[directory] = frozenset(os.listdir(directory))
+            except OSError:
+                self._directories_entries[directory] = frozenset()
+        return self._directories_entries[directory]
+
+    def exists(self, path: str) -> bool:
+        directory, name = os.path.split(path)
+        return name in self._directory_entries(directory)
+
+    def _real_path(self, path: str) -> Path:
+        if path not in self._real_paths:
+            self._real_paths[path] = Path(path).resolve()
+        return self._real_paths[path]
+
+    def resolve(self, name: str, imported_from: Path, level: int = 0) -> Optional[Path]:
+        key = (name, str(imported_from), level)
+        if key not in self._resolutions:
+            possible_base_paths = [os.path.abspath(imported_from)]
+            for i in range(level + 1):
+                possible_base_paths.append(os.path.dirname(possible_base_paths[i]))
+
+            target = None
+            relative_path = name.replace(".", "/")
+            for base_path in possible_base_paths:
+                dir_target = os.path.normpath(os.path.join(base_path, relative_path))
+                py_target = dir_target + ".py"
+                for possible_target in [dir_target, py_target]:
+                    if self.exists(possible_target):
+                        target = possible_target
+
+            self._resolutions[key] = self._real_path(target) if target else None
+        return self._resolutions[key]
 
 
 @dataclass
@@ -12,25 +67,12 @@ class Module:
     imported_from: Path
     level: int = 0
     asname: str = None
+    index: Optional[ImportResolutionIndex] = field(default=None, repr=False)
 
     def __post_init__(self):
-        self._is_local = False
-        self._target = None
-
-        possible_base_paths = [self.imported_from]
-        for i in range(self.level + 1):
-            possible_base_paths.append(possible_base_paths[i].parent)
-
-        for base_path in possible_base_paths:
-            relative_path = (self.name.replace(".", "/"))
-            dir_target = (base_path / relative_path).resolve()
-            py_target = (base_path / (relative_path + ".py")).resolve()
-            possible_targets = [dir_target, py_target]
-
-            for possible_target in possible_targets:
-                if possible_target.exists():
-                    self._target = possible_target
-                    self._is_local = True
+        index = self.index if self.index is not None else ImportResolutionIndex()
+        self._target = index.resolve(name=self.name, imported_from=self.imported_from, level=self.level)
+        self._is_local = self._target is not None
 
     @property
     def target(self) -> Path:
@@ -54,39 +96,41 @@ class LocalModule:
 
     @property
     def tree(self) -> ast.Module:
-        with open(self._file_path, 'r') as f:
-            return ast.parse(f.read())
+        return PARSE_CACHE.get_tree(self._file_path)
 
     def __repr__(self):
-        return ast.dump(node=self.tree, include_attributes=True, indent=4)
+        return ast.dump(node=PARSE_CACHE.get_tree(self._file_path, copy=False), include_attributes=True, indent=4)
 
 
 class ImportStatement:
-    def __init__(self, node: Union[ast.Import, ast.ImportFrom], from_path: Path):
+    def __init__(self, node: Union[ast.Import, ast.ImportFrom], from_path: Path,
+                 index: Optional[ImportResolutionIndex] = None):
         self._node = node
         self._from_path = from_path
         self._level = 0
+        self._index = index
 
     def to_string(self) -> str:
         return ast.unparse(self._node)
 
 
 class Import(ImportStatement):
-    def __init__(self, node: ast.Import, from_path: Path):
-        super().__init__(node=node, from_path=from_path)
+    def __init__(self, node: ast.Import, from_path: Path, index: Optional[ImportResolutionIndex] = None):
+        super().__init__(node=node, from_path=from_path, index=index)
 
     @property
     def modules(self) -> List[Module]:
-        return [Module(name=alias.name, imported_from=self._from_path, level=self._level, asname=alias.asname)
+        return [Module(name=alias.name, imported_from=self._from_path, level=self._level, asname=alias.asname,
+                       index=self._index)
                 for alias in self._node.names]
 
 
 class ImportFrom(ImportStatement):
-    def __init__(self, node: ast.ImportFrom, from_path: Path):
-        super().__init__(node=node, from_path=from_path)
+    def __init__(self, node: ast.ImportFrom, from_path: Path, index: Optional[ImportResolutionIndex] = None):
+        super().__init__(node=node, from_path=from_path, index=index)
         self._level = self._node.level
 
     @property
     def modules(self) -> List[Module]:
-        return [Module(name=self._node.module, imported_from=self._from_path, level=self._level)]
+        return [Module(name=self._node.module, imported_from=self._from_path, level=self._level, index=self._index)]
     
\ No newline at end of file
@@ -1,5 +1,13 @@
 import ast
-from typing import List, Union
+import builtins
+import math
+import sys
+import types
+from typing import Dict, List, Optional, Set, Union
+
+from .logger import Logger
+
+logger = Logger().get()
 
 
 class ImportNodesRemover(ast.NodeTransformer):
@@ -17,6 +25,18 @@ class ImportNodesRemover(ast.NodeTransformer):
         self._removed_nodes.append(node)
 
 
+def flatten_modules(tree: ast.Module) -> ast.Module:
+    # replaced imports are nested modules, their statements are moved to the module level in place
+    body = []
+    for statement in tree.body:
+        if isinstance(statement, ast.Module):
+            body.extend(flatten_modules(statement).body)
+        else:
+            body.append(statement)
+    tree.body = body
+    return tree
+
+
 def add_nodes_at_the_beginning(tree: ast.AST, nodes: List[ast.AST]) -> ast.AST:
     for node in nodes:
         tree.body.insert(0, node)
@@ -58,43 +78,409 @@ def optimize_imports_nodes(imports_nodes: List[Union[ast.Import, ast.ImportFrom]
     return optimized_nodes
 
 
-class UsedVisitor(ast.NodeVisitor):
-    def __init__(self):
-        self.used_functions_and_classes = set()
-        for builtin_method in dir(object):
-            self.used_functions_and_classes.add(builtin_method)
-        
-    def visit(self, node):
-        super().visit(node)
-        for child in ast.iter_child_nodes(node):
-            self.visit(child)
+DEFINITIONS_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+FUNCTIONS_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+ENUM_BASES_NAMES = ["Enum", "IntEnum", "StrEnum", "Flag", "IntFlag"]
 
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name):
-            self.used_functions_and_classes.add(node.func.id)
 
-    def visit_ClassDef(self, node):
-        for base in node.bases:
-            if isinstance(base, ast.Name):
-                self.used_functions_and_classes.add(base.id)
-        for ast_node in node.body:
-            if isinstance(ast_node, ast.FunctionDef):
-                self.used_functions_and_classes.add(ast_node.name)
+def is_dunder(name: str) -> bool:
+    return name.startswith("__") and name.endswith("__")
 
-    def visit_Name(self, node):
-        self.used_functions_and_classes.add(node.id)
 
+def is_enum_class(node: ast.ClassDef) -> bool:
+    for base in node.bases:
+        base_name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", None)
+        if base_name in ENUM_BASES_NAMES:
+            return True
+    return False
 
-class UnusedRemover(ast.NodeTransformer):
-    def __init__(self, used_functions_and_classes):
-        self.used_functions_and_classes = used_functions_and_classes
 
-    def visit_FunctionDef(self, node):
-        if node.name not in self.used_functions_and_classes:
-            return None
+class ReferencesGraph:
+    def __init__(self, tree: ast.Module, aggressive: bool = False):
+        # module level functions & classes are the graph nodes, other module level statements are the roots
+        # aggressive : methods & class attributes are kept only if their name is accessed by reachable code
+        self.aggressive = aggressive
+        self.roots: List[ast.stmt] = []
+        self.definitions: Dict[str, List[ast.stmt]] = {}
+        for statement in tree.body:
+            if isinstance(statement, DEFINITIONS_NODES):
+                self.definitions.setdefault(statement.name, []).append(statement)
+            else:
+                self.roots.append(statement)
+
+        self._reachable_names: Set[str] = set()
+        self._unreachable_members: Set[ast.stmt] = set()
+        self._traverse()
+
+    def reachable_names(self) -> Set[str]:
+        return self._reachable_names
+
+    def unreachable_members(self) -> Set[ast.stmt]:
+        return self._unreachable_members
+
+    def _class_member_keys(self, class_node: ast.ClassDef, statement: ast.stmt) -> List[str]:
+        if isinstance(statement, FUNCTIONS_NODES) and not is_dunder(statement.name):
+            return [statement.name]
+        if isinstance(statement, ast.Assign) and not is_enum_class(class_node):
+            if all(isinstance(target, ast.Name) and not is_dunder(target.id) for target in statement.targets):
+                return [target.id for target in statement.targets]
+        return []
+
+    def _traverse(self) -> None:
+        reachable_names = self._reachable_names
+        reachable_attributes = set()
+        pending_members: Dict[str, List[ast.stmt]] = {}
+        reached_members = set()
+
+        units: List[ast.AST] = list(self.roots)
+        while units:
+            unit = units.pop()
+
+            if self.aggressive and isinstance(unit, ast.ClassDef):
+                units.extend(unit.bases + unit.keywords + unit.decorator_list)
+                for statement in unit.body:
+                    keys = self._class_member_keys(unit, statement)
+                    if keys and all(key not in reachable_names and key not in reachable_attributes for key in keys):
+                        for key in keys:
+                            pending_members.setdefault(key, []).append(statement)
+                    else:
+                        reached_members.add(statement)
+                        units.append(statement)
+                continue
+
+            for child in ast.walk(unit):
+                key = None
+                if isinstance(child, ast.Name):
+                    if child.id not in reachable_names:
+                        key = child.id
+                        reachable_names.add(key)
+                        units.extend(self.definitions.get(key, []))
+                elif self.aggressive:
+                    # constant strings may be attributes names given to getattr, setattr, hasattr...
+                    if isinstance(child, ast.Attribute):
+                        key = child.attr
+                    elif isinstance(child, ast.Constant) and isinstance(child.value, str) and child.value.isidentifier():
+                        key = child.value
+                    if key in reachable_attributes:
+                        key = None
+                    elif key is not None:
+                        reachable_attributes.add(key)
+
+                for statement in pending_members.pop(key, []) if key is not None else []:
+                    if statement not in reached_members:
+                        reached_members.add(statement)
+                        units.append(statement)
+
+        for statements in pending_members.values():
+            self._unreachable_members.update(statement for statement in statements
+                                             if statement not in reached_members)
+
+
+class UnreachableRemover(ast.NodeTransformer):
+    # only module level functions & classes are removed by name, nested ones may be reached through attributes
+    # class members are removed only if aggressively found unreachable
+    def __init__(self, reachable_names: Set[str], unreachable_members: Set[ast.stmt] = set()):
+        self.reachable_names = reachable_names
+        self.unreachable_members = unreachable_members
+
+    def visit_Module(self, node):
+        body = []
+        for statement in node.body:
+            if isinstance(statement, DEFINITIONS_NODES) and statement.name not in self.reachable_names:
+                continue
+            body.append(self._remove_unreachable_members(statement))
+        node.body = body
         return node
 
-    def visit_ClassDef(self, node):
-        if node.name not in self.used_functions_and_classes:
+    def _remove_unreachable_members(self, node):
+        if not isinstance(node, ast.ClassDef):
+            return node
+        body = [self._remove_unreachable_members(statement) for statement in node.body
+                if statement not in self.unreachable_members]
+        node.body = body or [ast.Pass()]
+        return node
+
+
+def remove_dead_code(tree: ast.Module, aggressive: bool = False) -> ast.Module:
+    references_graph = ReferencesGraph(tree, aggressive=aggressive)
+    return UnreachableRemover(references_graph.reachable_names(), references_graph.unreachable_members()).visit(tree)
+
+
+FINAL_ANNOTATIONS_NAMES = ["Final"]
+BUILD_TIME_MODULE_NAME = "__build__"
+BUILD_TIME_STATEMENTS_NODES = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+                               ast.Assign, ast.AnnAssign)
+NUMPY_LITERAL_DTYPES_KINDS = "biuf"
+
+
+def is_final_assignment(statement: ast.stmt) -> bool:
+    if not isinstance(statement, ast.AnnAssign) or not isinstance(statement.target, ast.Name):
+        return False
+    if statement.value is None:
+        return False
+    annotation = statement.annotation.value if isinstance(statement.annotation, ast.Subscript) else statement.annotation
+    annotation_name = annotation.attr if isinstance(annotation, ast.Attribute) else getattr(annotation, "id", None)
+    return annotation_name in FINAL_ANNOTATIONS_NAMES
+
+
+def disabled_input(*args):
+    raise RuntimeError("input() can't be called at build time")
+
+
+def module_alias(namespace: dict, module_name: str) -> Optional[str]:
+    module = sys.modules.get(module_name)
+    if module is None:
+        return None
+    return next((name for name, value in namespace.items() if value is module), None)
+
+
+def numpy_literal_node(value, namespace: dict) -> Optional[ast.expr]:
+    numpy = sys.modules.get("numpy")
+    if numpy is None or not isinstance(value, (numpy.ndarray, numpy.generic)):
+        return None
+    numpy_alias = module_alias(namespace, "numpy")
+    if numpy_alias is None or value.dtype.kind not in NUMPY_LITERAL_DTYPES_KINDS or not numpy.isfinite(value).all():
+        return None
+
+    dtype = value.dtype.name
+    if isinstance(value, numpy.generic):
+        source = f"{numpy_alias}.{dtype}({value.item()!r})"
+    elif value.size > 0 and (value == value.flat[0]).all():
+        source = f"{numpy_alias}.full({value.shape!r}, {value.flat[0].item()!r}, dtype={dtype!r})"
+    else:
+        source = f"{numpy_alias}.array({value.tolist()!r}, dtype={dtype!r})"
+    return ast.parse(source, mode="eval").body
+
+
+def literal_node(value, namespace: dict) -> Optional[ast.expr]:
+    # exact types only : subclasses (enums, named tuples...) can't be written as literals
+    value_type = type(value)
+    if value is None or value_type in (bool, int, str, bytes):
+        return ast.Constant(value)
+    if value_type is float:
+        return ast.Constant(value) if math.isfinite(value) else None
+
+    if value_type in (tuple, list) or (value_type is set and value):
+        elements = [literal_node(element, namespace) for element in value]
+        if any(element is None for element in elements):
+            return None
+        if value_type is set:
+            return ast.Set(elts=elements)
+        return (ast.Tuple if value_type is tuple else ast.List)(elts=elements, ctx=ast.Load())
+    if value_type is dict:
+        keys = [literal_node(key, namespace) for key in value.keys()]
+        values = [literal_node(element, namespace) for element in value.values()]
+        if any(node is None for node in keys + values):
             return None
+        return ast.Dict(keys=keys, values=values)
+
+    return numpy_literal_node(value, namespace)
+
+
+def defined_names(statement: ast.stmt) -> Set[str]:
+    # names bound or modified (subscript & attribute targets) by a module level statement
+    if isinstance(statement, (ast.Import, ast.ImportFrom)):
+        return {bound_name(alias) for alias in statement.names}
+    if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {statement.name}
+    targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+    names = set()
+    for target in targets:
+        for node in ast.walk(target):
+            while isinstance(node, (ast.Subscript, ast.Attribute, ast.Starred)):
+                node = node.value
+            if isinstance(node, ast.Name):
+                names.add(node.id)
+    return names
+
+
+def used_names(statement: ast.stmt) -> Set[str]:
+    return {node.id for node in ast.walk(statement) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)}
+
+
+def build_time_indices(tree: ast.Module, final_indices: List[int]) -> Set[int]:
+    # only the statements the Final assignments depend on are evaluated, side effects of the others never run
+    definitions: Dict[str, List[int]] = {}
+    for i, statement in enumerate(tree.body[:final_indices[-1]]):
+        if isinstance(statement, BUILD_TIME_STATEMENTS_NODES):
+            for name in defined_names(statement):
+                definitions.setdefault(name, []).append(i)
+
+    # names bound by star imports are unknown, they are always evaluated
+    indices = {i for i, statement in enumerate(tree.body[:final_indices[-1]])
+               if isinstance(statement, ast.ImportFrom) and any(alias.name == "*" for alias in statement.names)}
+    for final_index in final_indices:
+        needed = {final_index}
+        pending = [final_index]
+        while pending:
+            for name in used_names(tree.body[pending.pop()]):
+                for i in definitions.get(name, []):
+                    if i < final_index and i not in needed:
+                        needed.add(i)
+                        pending.append(i)
+        indices |= needed
+    return indices
+
+
+def fold_constants(tree: ast.Module) -> ast.Module:
+    # module level assignments annotated with Final are evaluated at build time & replaced by their value
+    final_indices = [i for i, statement in enumerate(tree.body) if is_final_assignment(statement)]
+    if not final_indices:
+        return tree
+    evaluated_indices = build_time_indices(tree, final_indices)
+
+    module = types.ModuleType(BUILD_TIME_MODULE_NAME)
+    module.__dict__["__builtins__"] = {**builtins.__dict__, "input": disabled_input}
+    sys.modules[BUILD_TIME_MODULE_NAME] = module
+    try:
+        for i in range(final_indices[-1] + 1):
+            statement = tree.body[i]
+            if i not in evaluated_indices or not isinstance(statement, BUILD_TIME_STATEMENTS_NODES):
+                continue
+            try:
+                code = compile(ast.fix_missing_locations(ast.Module(body=[statement], type_ignores=[])),
+                               BUILD_TIME_MODULE_NAME, "exec")
+                exec(code, module.__dict__)
+            except Exception as e:
+                logger.info(f"Statement at line {statement.lineno} not evaluated at build time: {e!r}")
+                continue
+
+            if is_final_assignment(statement):
+                name = statement.target.id
+                value_node = literal_node(module.__dict__[name], module.__dict__)
+                if value_node is None:
+                    logger.info(f"Constant {name} of type {type(module.__dict__[name]).__name__} not folded")
+                    continue
+                tree.body[i] = ast.copy_location(ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())],
+                                                            value=value_node), statement)
+    finally:
+        sys.modules.pop(BUILD_TIME_MODULE_NAME, None)
+    return tree
+
+
+def is_lazy_module(module_name: Optional[str], lazy_modules: List[str]) -> bool:
+    return module_name is not None and any(module_name == lazy_module or module_name.startswith(f"{lazy_module}.")
+                                           for lazy_module in lazy_modules)
+
+
+def bound_name(alias: ast.alias) -> str:
+    return alias.asname or alias.name.split(".")[0]
+
+
+def function_arguments(node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> List[ast.arg]:
+    arguments = node.args
+    return [argument for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs
+            + [arguments.vararg, arguments.kwarg] if argument is not None]
+
+
+class AnnotationsStringifier(ast.NodeTransformer):
+    # annotations evaluated when the module is executed are replaced by strings if they use a lazy name
+    def __init__(self, names: Set[str]):
+        self.names = names
+
+    def _stringify(self, annotation: Optional[ast.expr]) -> Optional[ast.expr]:
+        if annotation is None or not any(isinstance(child, ast.Name) and child.id in self.names
+                                         for child in ast.walk(annotation)):
+            return annotation
+        return ast.copy_location(ast.Constant(ast.unparse(annotation)), annotation)
+
+    def _visit_function(self, node):
+        for argument in function_arguments(node):
+            argument.annotation = self._stringify(argument.annotation)
+        node.returns = self._stringify(node.returns)
+        return node
+
+    def visit_FunctionDef(self, node):
+        return self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node):
+        return self._visit_function(node)
+
+    def visit_AnnAssign(self, node):
+        node.annotation = self._stringify(node.annotation)
         return node
+
+
+class ExecutedNamesVisitor(ast.NodeVisitor):
+    # names used when the module is executed : everything but functions bodies
+    def __init__(self):
+        self.names: Set[str] = set()
+
+    def visit_Name(self, node):
+        self.names.add(node.id)
+
+    def _visit_function(self, node):
+        for child in node.decorator_list + node.args.defaults + [default for default in node.args.kw_defaults
+                                                                 if default is not None]:
+            self.visit(child)
+        for argument in function_arguments(node):
+            if argument.annotation is not None:
+                self.visit(argument.annotation)
+        if node.returns is not None:
+            self.visit(node.returns)
+
+    def visit_FunctionDef(self, node):
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node):
+        self._visit_function(node)
+
+
+class LazyImportsInserter(ast.NodeTransformer):
+    # outermost functions using a lazy name import it first, nested functions get it through their closure
+    def __init__(self, imports_by_name: Dict[str, ast.stmt]):
+        self.imports_by_name = imports_by_name
+
+    def _insert_imports(self, node):
+        used_names = {child.id for statement in node.body for child in ast.walk(statement)
+                      if isinstance(child, ast.Name)}
+        used_names.difference_update(argument.arg for argument in function_arguments(node))
+        imports = [self.imports_by_name[name] for name in sorted(used_names) if name in self.imports_by_name]
+        # imports go after the docstring, to keep it as __doc__
+        position = 1 if ast.get_docstring(node, clean=False) is not None else 0
+        node.body[position:position] = [ast.copy_location(import_node, node.body[0]) for import_node in imports]
+        return node
+
+    def visit_FunctionDef(self, node):
+        return self._insert_imports(node)
+
+    def visit_AsyncFunctionDef(self, node):
+        return self._insert_imports(node)
+
+
+def make_imports_lazy(tree: ast.Module, lazy_modules: List[str]) -> ast.Module:
+    lazy_names: Dict[str, ast.stmt] = {}
+    lazy_aliases: Set[ast.alias] = set()
+    for statement in tree.body:
+        if isinstance(statement, ast.ImportFrom) and statement.level == 0:
+            aliases = statement.names if is_lazy_module(statement.module, lazy_modules) else []
+            for alias in aliases:
+                lazy_names[bound_name(alias)] = ast.ImportFrom(module=statement.module, names=[alias], level=0)
+                lazy_aliases.add(alias)
+        elif isinstance(statement, ast.Import):
+            for alias in [alias for alias in statement.names if is_lazy_module(alias.name, lazy_modules)]:
+                lazy_names[bound_name(alias)] = ast.Import(names=[alias])
+                lazy_aliases.add(alias)
+    if not lazy_names:
+        return tree
+
+    tree = AnnotationsStringifier(set(lazy_names)).visit(tree)
+    executed_names_visitor = ExecutedNamesVisitor()
+    for statement in tree.body:
+        if not isinstance(statement, (ast.Import, ast.ImportFrom)):
+            executed_names_visitor.visit(statement)
+    for name in list(lazy_names):
+        if name in executed_names_visitor.names:
+            logger.info(f"Import of {name} kept at module level, {name} is used when the module is executed")
+            lazy_aliases.difference_update(lazy_names.pop(name).names)
+
+    body = []
+    for statement in tree.body:
+        if isinstance(statement, (ast.Import, ast.ImportFrom)):
+            statement.names = [alias for alias in statement.names if alias not in lazy_aliases]
+            if not statement.names:
+                continue
+        body.append(statement)
+    tree.body = body
+
+    return LazyImportsInserter(lazy_names).visit(tree)
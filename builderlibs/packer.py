@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+import base64
+import marshal
+import sys
+import time
+import zlib
+
+
+SOURCE_FORMAT = "source"
+PACKED_FORMAT = "packed"
+PACKED_BYTECODE_FORMAT = "packed-bytecode"
+PACK_FORMATS = [SOURCE_FORMAT, PACKED_FORMAT, PACKED_BYTECODE_FORMAT]
+
+PACKED_FILE_NAME = "<packed>"
+
+# base85 alphabet has no quote nor backslash : the payload can be embedded as is in a bytes literal
+PACKED_STUB = """import base64, zlib
+exec(compile(zlib.decompress(base64.b85decode(b"{payload}")).decode(), "{file_name}", "exec"))
+"""
+
+# bytecode is only valid for the python version it is compiled with
+PACKED_BYTECODE_STUB = """import base64, marshal, sys, zlib
+if sys.version_info[:2] != {version}:
+    raise RuntimeError("bytecode packed for python {version_name}, running %d.%d" % sys.version_info[:2])
+exec(marshal.loads(zlib.decompress(base64.b85decode(b"{payload}"))))
+"""
+
+
+@dataclass
+class PackedSource:
+    format: str
+    source: str
+    source_size: int
+    payload_size: int
+    decode_duration: float
+
+    @property
+    def ratio(self) -> float:
+        return len(self.source) / self.source_size
+
+    def report(self) -> str:
+        return (f"{self.format}: {self.source_size} bytes of source, {self.payload_size} bytes of payload, "
+                f"{len(self.source)} bytes written ({100 * self.ratio:.1f}%), "
+                f"decoded in {1000 * self.decode_duration:.2f}ms")
+
+
+def encode_payload(content: bytes) -> str:
+    return base64.b85encode(zlib.compress(content, level=9)).decode()
+
+
+def decode_payload(payload: str) -> bytes:
+    return zlib.decompress(base64.b85decode(payload))
+
+
+def measure_decode_duration(payload: str, bytecode: bool) -> float:
+    start = time.perf_counter()
+    content = decode_payload(payload)
+    if bytecode:
+        marshal.loads(content)
+    else:
+        compile(content.decode(), PACKED_FILE_NAME, "exec")
+    return time.perf_counter() - start
+
+
+def pack_source(source: str, format: str = SOURCE_FORMAT) -> PackedSource:
+    source_size = len(source.encode())
+    if format == SOURCE_FORMAT:
+        return PackedSource(format=format, source=source, source_size=source_size, payload_size=source_size,
+                            decode_duration=0)
+
+    if format == PACKED_FORMAT:
+        payload = encode_payload(source.encode())
+        stub = PACKED_STUB.format(payload=payload, file_name=PACKED_FILE_NAME)
+    elif format == PACKED_BYTECODE_FORMAT:
+        payload = encode_payload(marshal.dumps(compile(source, PACKED_FILE_NAME, "exec")))
+        version = tuple(sys.version_info[:2])
+        stub = PACKED_BYTECODE_STUB.format(payload=payload, version=version, version_name="%d.%d" % version)
+    else:
+        raise ValueError(f"Unknown format {format}, expected one of {PACK_FORMATS}")
+
+    return PackedSource(format=format, source=stub, source_size=source_size, payload_size=len(payload),
+                        decode_duration=measure_decode_duration(payload, bytecode=format == PACKED_BYTECODE_FORMAT))
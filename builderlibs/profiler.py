@@ -0,0 +1,101 @@
+import ast
+from typing import List
+
+PROFILED_CLASSES_NAMES = ["GameLoop"]
+DEFINITIONS_STATEMENTS_NODES = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+                                ast.Assign, ast.AnnAssign, ast.AugAssign)
+
+# phases are measured once, the report is a single json line on stderr after the first turn is parsed
+# (after __init__ for bots without update_assets)
+STARTUP_PROFILER_SOURCE = """
+import json as _startup_json
+import sys as _startup_sys
+import time as _startup_time
+_STARTUP_START = _startup_time.perf_counter()
+_STARTUP_PHASES = {}
+
+
+def _startup_mark(phase, start):
+    _STARTUP_PHASES[f"{phase}_ms"] = round(1000 * (_startup_time.perf_counter() - start), 3)
+
+
+def _startup_report():
+    _STARTUP_PHASES["total_ms"] = round(1000 * (_startup_time.perf_counter() - _STARTUP_START), 3)
+    print(_startup_json.dumps({"startup": _STARTUP_PHASES}), file=_startup_sys.stderr, flush=True)
+
+
+def _startup_wrap(cls, method_name, phase, report):
+    method = getattr(cls, method_name)
+
+    def wrapper(*args, **kwargs):
+        if f"{phase}_ms" in _STARTUP_PHASES:
+            return method(*args, **kwargs)
+        start = _startup_time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _startup_mark(phase, start)
+            if report:
+                _startup_report()
+    setattr(cls, method_name, wrapper)
+
+
+def _startup_profile_class(cls):
+    has_update_assets = hasattr(cls, "update_assets")
+    _startup_wrap(cls, "__init__", "init", report=not has_update_assets)
+    if has_update_assets:
+        _startup_wrap(cls, "update_assets", "first_turn", report=True)
+"""
+
+IMPORTS_MARK_SOURCE = """
+_startup_mark("imports", _STARTUP_START)
+_STARTUP_DEFINITIONS_START = _startup_time.perf_counter()
+"""
+DEFINITIONS_MARK_SOURCE = """
+_startup_mark("definitions", _STARTUP_DEFINITIONS_START)
+"""
+# bots without a profiled class run their loop at module level : only imports & definitions are reported
+DEFINITIONS_REPORT_SOURCE = """
+_startup_report()
+"""
+
+
+def parse_statements(source: str) -> List[ast.stmt]:
+    return ast.parse(source).body
+
+
+def instrument_startup(tree: ast.Module) -> ast.Module:
+    profiler_nodes = parse_statements(STARTUP_PROFILER_SOURCE)
+
+    # __future__ imports must stay first
+    future_nodes = [statement for statement in tree.body
+                    if isinstance(statement, ast.ImportFrom) and statement.module == "__future__"]
+    profiled_class = any(isinstance(statement, ast.ClassDef) and statement.name in PROFILED_CLASSES_NAMES
+                         for statement in tree.body)
+    definitions_mark_source = DEFINITIONS_MARK_SOURCE
+    if not profiled_class:
+        definitions_mark_source += DEFINITIONS_REPORT_SOURCE
+    body = []
+    imports_done = False
+    definitions_done = False
+    for statement in tree.body:
+        if statement in future_nodes:
+            continue
+        if not imports_done and not isinstance(statement, (ast.Import, ast.ImportFrom)):
+            body.extend(parse_statements(IMPORTS_MARK_SOURCE))
+            imports_done = True
+        if imports_done and not definitions_done and not isinstance(statement, DEFINITIONS_STATEMENTS_NODES):
+            body.extend(parse_statements(definitions_mark_source))
+            definitions_done = True
+
+        body.append(statement)
+        if isinstance(statement, ast.ClassDef) and statement.name in PROFILED_CLASSES_NAMES:
+            body.extend(parse_statements(f"_startup_profile_class({statement.name})"))
+
+    if not imports_done:
+        body.extend(parse_statements(IMPORTS_MARK_SOURCE))
+    if not definitions_done:
+        body.extend(parse_statements(definitions_mark_source))
+
+    tree.body = future_nodes + profiler_nodes + body
+    return ast.fix_missing_locations(tree)
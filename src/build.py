@@ -1,31 +1,74 @@
 from pathlib import Path
 from argparse import ArgumentParser
+import sys
+import time
 
 from builderlibs.challenge import ChallengeFolder
+from builderlibs.config import BUILD_CONFIG
+from builderlibs.cache import BuildCache, PARSE_CACHE
+from builderlibs.batch import find_challenges, build_challenges, format_builds_summary
+from builderlibs.packer import pack_source, PACK_FORMATS, SOURCE_FORMAT
 
 
 ROOT = Path(__file__).parent.parent.resolve()
 BOTS_DIRECTORY = ROOT / "bots"
 BOTLIBS_DIRECTORY = ROOT / "botlibs"
+BUILD_CACHE_DIRECTORY = ROOT / ".build_cache"
 
 
-parser = ArgumentParser()
-parser.add_argument("-c", "--challenge_name", type=str)
-parser.add_argument("-m", "--make", type=bool, default=True)
-parser.add_argument("-d", "--destroy", type=bool, default=False)
-arguments = parser.parse_args().__dict__
-
-challenge_name = arguments["challenge_name"]
-make_challenge = arguments["make"]
-destroy_challenge = arguments["destroy"]
-
-challenge_folder = ChallengeFolder(name=challenge_name, parent=BOTS_DIRECTORY)
-if make_challenge:
-    challenge_folder.make()
-if destroy_challenge:
-    if challenge_folder.exists():
-        challenge_folder.destroy(force_destroy=False)
-else:
-    challenge_source = challenge_folder.aggregate_to_source(local_packages_paths=[BOTLIBS_DIRECTORY])
-    with open(BOTS_DIRECTORY / f"{challenge_name}_built.py", "w") as f:
-        f.write(challenge_source)
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-c", "--challenge_name", type=str)
+    parser.add_argument("-m", "--make", type=bool, default=True)
+    parser.add_argument("-d", "--destroy", type=bool, default=False)
+    parser.add_argument("-a", "--all", action="store_true")
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("--cache_directory", type=Path, default=BUILD_CACHE_DIRECTORY)
+    parser.add_argument("--no_cache", action="store_true")
+    parser.add_argument("--aggressive", action="store_true")
+    parser.add_argument("--profile_startup", action="store_true")
+    parser.add_argument("--lazy_imports", action="store_true")
+    parser.add_argument("-f", "--format", type=str, choices=PACK_FORMATS, default=SOURCE_FORMAT)
+    arguments = parser.parse_args().__dict__
+
+    challenge_name = arguments["challenge_name"]
+    make_challenge = arguments["make"]
+    destroy_challenge = arguments["destroy"]
+    # --no_cache bypasses the on-disk build cache and the in-memory parse cache
+    use_cache = not arguments["no_cache"]
+    cache_directory = arguments["cache_directory"] if use_cache else None
+    lazy_imports = BUILD_CONFIG["lazy_imports"] if arguments["lazy_imports"] else None
+
+    if arguments["all"]:
+        start = time.perf_counter()
+        builds = build_challenges(names=find_challenges(BOTS_DIRECTORY),
+                                  parent=BOTS_DIRECTORY,
+                                  local_packages_paths=[BOTLIBS_DIRECTORY],
+                                  cache_directory=cache_directory,
+                                  max_workers=arguments["jobs"],
+                                  aggressive=arguments["aggressive"],
+                                  format=arguments["format"],
+                                  profile_startup=arguments["profile_startup"],
+                                  lazy_imports=lazy_imports,
+                                  use_cache=use_cache)
+        print(format_builds_summary(builds, total_duration=time.perf_counter() - start))
+        sys.exit(0 if all(build.succeeded for build in builds) else 1)
+
+    challenge_folder = ChallengeFolder(name=challenge_name, parent=BOTS_DIRECTORY)
+    if make_challenge:
+        challenge_folder.make()
+    if destroy_challenge:
+        if challenge_folder.exists():
+            challenge_folder.destroy(force_destroy=False)
+    else:
+        PARSE_CACHE.enabled = use_cache
+        build_cache = BuildCache(directory=cache_directory) if use_cache else None
+        challenge_source = challenge_folder.aggregate_to_source(local_packages_paths=[BOTLIBS_DIRECTORY],
+                                                               build_cache=build_cache,
+                                                               aggressive=arguments["aggressive"],
+                                                               profile_startup=arguments["profile_startup"],
+                                                               lazy_imports=lazy_imports)
+        packed_source = pack_source(challenge_source, format=arguments["format"])
+        with open(BOTS_DIRECTORY / f"{challenge_name}_built.py", "w") as f:
+            f.write(packed_source.source)
+        print(packed_source.report())
@@ -0,0 +1,21 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="run benchmarks, compared to their saved baselines")
+    parser.addoption("--benchmark_save", action="store_true", help="run benchmarks and save them as baselines")
+    parser.addoption("--benchmark_tolerance", type=float, default=2.0,
+                     help="a benchmark fails if it is slower or bigger than its baseline times this tolerance")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: run with --benchmark or --benchmark_save only")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark") or config.getoption("--benchmark_save"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="needs --benchmark or --benchmark_save")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
@@ -1,9 +1,27 @@
+from functools import partial
+from timeit import repeat
+from typing import List, Set
+import sys
+import time
+
 import numpy as np
 import pytest
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import maximum_flow
 
-from botlibs.graph.algorithms import DijkstraAlgorithm
-from botlibs.graph.classes import Edge, AdjacencyMatrix, AdjacencyList, NodesPair
-from botlibs.graph.create import create_adjacency_matrix_from_edges, create_adjacency_list_from_edges
+from botlibs.graph.algorithms import ShortestPathsAlgorithm, DijkstraAlgorithm, BreadthFirstSearchAlgorithm, \
+    create_shortest_paths_algorithm, multi_source_dijkstra, find_closest_nodes_pair_from_sources
+from botlibs.graph.classes import Edge, AdjacencyMatrix, AdjacencyList, CompactAdjacencyList, NodesPair, \
+    SparseAdjacencyMatrix
+from botlibs.graph.connectivity import UnionFind, connected_components, articulation_points_and_bridges, \
+    IncrementalComponents
+from botlibs.graph.flow import max_flow, DangerousLinksScorer
+from botlibs.graph.grid import GridGraph
+from botlibs.graph.search import AStarSearch, BidirectionalDijkstraSearch, manhattan_heuristic, \
+    euclidean_heuristic
+from botlibs.graph.territory import voronoi_partition, unit_voronoi_partition, weighted_voronoi_partition
+from botlibs.graph.create import create_adjacency_matrix_from_edges, create_adjacency_list_from_edges, \
+    create_sparse_adjacency_matrix_from_edges, create_compact_adjacency_list_from_edges
 
 
 @pytest.mark.parametrize("edges, nodes_number", [
@@ -23,6 +41,61 @@ def test_create_adjacency_matrix_from_edges(edges, nodes_number):
             assert adjacency_matrix[edge.to_node, edge.from_node] == 0
 
 
+@pytest.mark.parametrize("edges, nodes_number", [
+    ([Edge(1, 3, True), Edge(2, 3, True), Edge(0, 1, True), Edge(0, 2, True)], 4),
+    ([Edge(1, 3, True, 2), Edge(2, 3, False), Edge(0, 1, True), Edge(0, 2, False), Edge(2, 0, True, 0)], 4)
+])
+def test_create_sparse_adjacency_matrix_from_edges(edges, nodes_number):
+    sparse_adjacency_matrix = create_sparse_adjacency_matrix_from_edges(edges, nodes_number)
+    adjacency_matrix = create_adjacency_matrix_from_edges(edges, nodes_number)
+
+    assert isinstance(sparse_adjacency_matrix, SparseAdjacencyMatrix)
+    assert np.array_equal(sparse_adjacency_matrix.array, adjacency_matrix.array)
+    assert sparse_adjacency_matrix.sparce_matrix.nnz == np.count_nonzero(adjacency_matrix.array)
+
+
+@pytest.mark.parametrize("key", [(1, 2), (np.int64(3), np.int32(4)), 1, np.int64(2), (1, slice(None)),
+                                 (slice(None), 2), slice(1, 3), [0, 2], (-1, -2)])
+def test_sparse_adjacency_matrix_getitem(key):
+    edges = [Edge(0, 1), Edge(1, 2, weight=3), Edge(2, 3, directed=True), Edge(3, 4, weight=2)]
+    sparse_adjacency_matrix = create_sparse_adjacency_matrix_from_edges(edges, 5)
+    adjacency_matrix = create_adjacency_matrix_from_edges(edges, 5)
+    sparse_adjacency_matrix.add_edge(Edge(4, 1, weight=6))
+    adjacency_matrix.add_edge(Edge(4, 1, weight=6))
+
+    assert np.array_equal(sparse_adjacency_matrix[key], adjacency_matrix[key])
+
+
+def test_sparse_adjacency_matrix_setitem_rejects_slices():
+    sparse_adjacency_matrix = SparseAdjacencyMatrix(nodes_number=3)
+    with pytest.raises(TypeError):
+        sparse_adjacency_matrix[0, :] = 1
+
+
+def test_sparse_adjacency_matrix_updates():
+    nodes_number = 5
+    edges = [Edge(0, 1), Edge(1, 2, weight=3), Edge(2, 3, directed=True), Edge(3, 4, weight=2)]
+    sparse_adjacency_matrix = create_sparse_adjacency_matrix_from_edges(edges, nodes_number)
+    adjacency_matrix = create_adjacency_matrix_from_edges(edges, nodes_number)
+    initial_sparse_adjacency_matrix = sparse_adjacency_matrix.copy()
+
+    updates = [("remove_edge", Edge(1, 2)), ("add_edge", Edge(0, 4, directed=True, weight=5)),
+               ("update_edge", Edge(3, 4), 7), ("add_edge", Edge(1, 2, weight=4)), ("remove_edge", Edge(0, 1)),
+               ("add_edge", Edge(4, 0))]
+    for method_name, edge, *weight in updates:
+        getattr(sparse_adjacency_matrix, method_name)(edge, *weight)
+        getattr(adjacency_matrix, method_name)(edge, *weight)
+        assert sparse_adjacency_matrix[edge.from_node, edge.to_node] == adjacency_matrix[edge.from_node, edge.to_node]
+
+    assert np.array_equal(sparse_adjacency_matrix.sparce_matrix.toarray(), adjacency_matrix.array)
+    assert sparse_adjacency_matrix.sparce_matrix.nnz == np.count_nonzero(adjacency_matrix.array)
+    assert np.array_equal(initial_sparse_adjacency_matrix.array,
+                          create_adjacency_matrix_from_edges(edges, nodes_number).array)
+
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix=sparse_adjacency_matrix)
+    assert np.array_equal(dijkstra_algorithm.dist_matrix, DijkstraAlgorithm(adjacency_matrix).dist_matrix)
+
+
 @pytest.mark.parametrize("edges, nodes_number_expected", [
     ([Edge(1, 3), Edge(2, 3), Edge(0, 1), Edge(0, 2)], 4)
 ])
@@ -105,3 +178,639 @@ def test_dijkstra_algorithm_find_closest_pair(adjacency_matrix, from_nodes, to_n
 
     # assert
     assert closest_pair == closest_pair_expected
+
+
+def assert_predecessors_are_shortest_paths(dijkstra_algorithm: DijkstraAlgorithm):
+    csgraph = dijkstra_algorithm.csgraph.toarray()
+    dist_matrix, predecessors = dijkstra_algorithm.dist_matrix, dijkstra_algorithm.predecessors
+    for from_node, to_node in zip(*np.nonzero(np.isfinite(dist_matrix) & (dist_matrix > 0))):
+        predecessor = predecessors[from_node, to_node]
+        assert csgraph[predecessor, to_node] > 0
+        assert np.isclose(dist_matrix[from_node, predecessor] + csgraph[predecessor, to_node],
+                          dist_matrix[from_node, to_node])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dijkstra_algorithm_incremental(seed):
+    rng = np.random.default_rng(seed)
+    nodes_number = 40
+    edges = [Edge(int(i), int(j), directed=bool(rng.integers(2)), weight=int(rng.integers(1, 5)))
+             for i, j in rng.integers(nodes_number, size=(120, 2)) if i != j]
+    adjacency_matrix = create_sparse_adjacency_matrix_from_edges(edges, nodes_number)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+    lazy_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, lazy=True)
+    assert dijkstra_algorithm.recomputed_rows == nodes_number
+
+    for _ in range(10):
+        adjacency_matrix = adjacency_matrix.copy()
+        for edge in rng.choice(edges, size=int(rng.integers(1, 4))):
+            if rng.integers(2):
+                adjacency_matrix.remove_edge(edge)
+            else:
+                adjacency_matrix.update_edge(edge, int(rng.integers(1, 5)))
+
+        dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, previous=dijkstra_algorithm)
+        lazy_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, previous=lazy_dijkstra_algorithm, lazy=True)
+        full_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+
+        assert np.array_equal(dijkstra_algorithm.dist_matrix, full_dijkstra_algorithm.dist_matrix)
+        assert_predecessors_are_shortest_paths(dijkstra_algorithm)
+        lazy_dijkstra_algorithm.compute_rows(range(5))
+        assert np.array_equal(lazy_dijkstra_algorithm.dist_matrix[:5], full_dijkstra_algorithm.dist_matrix[:5])
+
+
+def test_dijkstra_algorithm_incremental_recomputed_rows():
+    # 0 - 1 - 2 - 3 - 4 - 5, then 5 -> 4 is made heavier
+    nodes_number = 6
+    edges = [Edge(i, i + 1) for i in range(nodes_number - 1)]
+    adjacency_matrix = create_sparse_adjacency_matrix_from_edges(edges, nodes_number)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+
+    unchanged_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix.copy(), previous=dijkstra_algorithm)
+    assert unchanged_dijkstra_algorithm.recomputed_rows == 0
+
+    adjacency_matrix = adjacency_matrix.copy()
+    adjacency_matrix.update_edge(Edge(5, 4, directed=True), 3)
+    incremental_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, previous=dijkstra_algorithm)
+    assert incremental_dijkstra_algorithm.recomputed_rows == 1
+    assert incremental_dijkstra_algorithm.dist_matrix[5, 0] == 7
+    assert DijkstraAlgorithm(adjacency_matrix, previous=dijkstra_algorithm,
+                             changed_edges=[(5, 4)]).recomputed_rows == 1
+
+    adjacency_matrix = adjacency_matrix.copy()
+    adjacency_matrix.remove_edge(Edge(2, 3))
+    full_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, previous=incremental_dijkstra_algorithm)
+    assert full_dijkstra_algorithm.recomputed_rows == nodes_number
+    assert np.isinf(full_dijkstra_algorithm.dist_matrix[0, 5])
+
+
+def random_sparse_adjacency_matrix(seed: int, nodes_number: int = 40, edges_number: int = 120, max_weight: int = 4):
+    rng = np.random.default_rng(seed)
+    edges = [Edge(int(i), int(j), directed=bool(rng.integers(2)), weight=int(rng.integers(1, max_weight + 1)))
+             for i, j in rng.integers(nodes_number, size=(edges_number, 2)) if i != j]
+    return create_sparse_adjacency_matrix_from_edges(edges, nodes_number)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dijkstra_algorithm_lazy(seed):
+    adjacency_matrix = random_sparse_adjacency_matrix(seed)
+    full_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+    lazy_dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, lazy=True)
+    assert lazy_dijkstra_algorithm.recomputed_rows == 0
+
+    from_nodes, to_nodes = [3, 7, 11], [20, 25, 30, 35]
+    closest_pair = lazy_dijkstra_algorithm.find_closest_nodes_pair(from_nodes=from_nodes, to_nodes=to_nodes)
+    assert closest_pair == full_dijkstra_algorithm.find_closest_nodes_pair(from_nodes=from_nodes, to_nodes=to_nodes)
+    assert lazy_dijkstra_algorithm.recomputed_rows == len(from_nodes)
+    assert np.array_equal(lazy_dijkstra_algorithm.dist_matrix[from_nodes],
+                          full_dijkstra_algorithm.dist_matrix[from_nodes])
+
+    lazy_dijkstra_algorithm.find_closest_nodes_pair(from_nodes=from_nodes[:2], to_nodes=to_nodes)
+    assert lazy_dijkstra_algorithm.recomputed_rows == len(from_nodes)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_multi_source_dijkstra(seed):
+    adjacency_matrix = random_sparse_adjacency_matrix(seed)
+    dist_matrix = DijkstraAlgorithm(adjacency_matrix).dist_matrix
+    sources = [0, 5, 9]
+
+    dist, predecessors, origins = multi_source_dijkstra(adjacency_matrix.sparce_matrix, sources)
+    assert np.array_equal(dist, dist_matrix[sources].min(axis=0))
+    reached = np.isfinite(dist)
+    assert np.array_equal(dist[reached], dist_matrix[origins[reached], np.flatnonzero(reached)])
+
+    targets = [20, 30]
+    early_dist, _, _ = multi_source_dijkstra(adjacency_matrix.sparce_matrix, sources, targets)
+    assert np.array_equal(early_dist[targets], dist[targets])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_find_closest_nodes_pair_from_sources(seed):
+    adjacency_matrix = random_sparse_adjacency_matrix(seed)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+    from_nodes, to_nodes = [3, 7, 11], [20, 25, 30, 35]
+
+    closest_pair = find_closest_nodes_pair_from_sources(adjacency_matrix.sparce_matrix, from_nodes, to_nodes)
+    closest_pair_expected = dijkstra_algorithm.find_closest_nodes_pair(from_nodes=from_nodes, to_nodes=to_nodes)
+    assert closest_pair.distance == closest_pair_expected.distance
+    if closest_pair.from_node is not None:
+        assert dijkstra_algorithm.dist_matrix[closest_pair.from_node, closest_pair.to_node] == closest_pair.distance
+        path = [closest_pair.from_node] + closest_pair.shortest_path
+        assert sum(adjacency_matrix[i, j] for i, j in zip(path[:-1], path[1:])) == closest_pair.distance
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("engine", ["numpy", "deque"])
+def test_breadth_first_search_algorithm(seed, engine):
+    adjacency_matrix = random_sparse_adjacency_matrix(seed, max_weight=1)
+    bfs_algorithm = BreadthFirstSearchAlgorithm(adjacency_matrix, engine=engine)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+
+    assert np.array_equal(bfs_algorithm.dist_matrix, dijkstra_algorithm.dist_matrix)
+    assert bfs_algorithm.predecessors.shape == dijkstra_algorithm.predecessors.shape
+    assert bfs_algorithm.predecessors.dtype == dijkstra_algorithm.predecessors.dtype
+    assert_predecessors_are_shortest_paths(bfs_algorithm)
+
+    lazy_algorithm = BreadthFirstSearchAlgorithm(adjacency_matrix, lazy=True, engine=engine)
+    closest_pair = lazy_algorithm.find_closest_nodes_pair([0, 1, 2], [20, 30])
+    assert closest_pair.distance == dijkstra_algorithm.find_closest_nodes_pair([0, 1, 2], [20, 30]).distance
+    assert lazy_algorithm.recomputed_rows == 3
+
+
+@pytest.mark.parametrize("adjacency_matrix, algorithm_class_expected", [
+    (random_sparse_adjacency_matrix(0, max_weight=1), BreadthFirstSearchAlgorithm),
+    (random_sparse_adjacency_matrix(0), DijkstraAlgorithm),
+])
+def test_create_shortest_paths_algorithm(adjacency_matrix, algorithm_class_expected):
+    shortest_paths_algorithm = create_shortest_paths_algorithm(adjacency_matrix)
+    assert type(shortest_paths_algorithm) is algorithm_class_expected
+    assert np.array_equal(shortest_paths_algorithm.dist_matrix, DijkstraAlgorithm(adjacency_matrix).dist_matrix)
+
+
+@pytest.mark.parametrize("adjacency_matrix", [AdjacencyMatrix(np.zeros((3, 3))), SparseAdjacencyMatrix(nodes_number=3)])
+def test_zero_weight_edges_are_removed(adjacency_matrix):
+    # 0 always means no edge : 0 weighted edges can't be added, shortest paths ignore them
+    for edge in [Edge(0, 1), Edge(1, 2), Edge(0, 2, weight=0)]:
+        adjacency_matrix.add_edge(edge)
+
+    assert adjacency_matrix.sparce_matrix.nnz == 4
+    shortest_paths_algorithm = create_shortest_paths_algorithm(adjacency_matrix)
+    assert type(shortest_paths_algorithm) is BreadthFirstSearchAlgorithm
+    assert shortest_paths_algorithm.dist_matrix[0, 2] == 2
+
+
+def test_sparse_adjacency_matrix_drops_stored_zeros():
+    sparce_matrix = csr_matrix((np.array([0., 1.]), (np.array([0, 1]), np.array([1, 2]))), shape=(3, 3))
+    sparse_adjacency_matrix = SparseAdjacencyMatrix(nodes_number=3, sparce_matrix=sparce_matrix)
+
+    assert sparse_adjacency_matrix.sparce_matrix.nnz == 1
+    assert sparce_matrix.nnz == 2
+    assert np.isinf(DijkstraAlgorithm(sparse_adjacency_matrix).dist_matrix[0, 1])
+
+
+def test_shortest_paths_algorithm_is_abstract():
+    with pytest.raises(TypeError):
+        ShortestPathsAlgorithm(AdjacencyMatrix(np.zeros((2, 2))))
+
+
+def find_closest_nodes_pair_loop(dijkstra_algorithm: DijkstraAlgorithm, from_nodes, to_nodes) -> NodesPair:
+    closest_pair = NodesPair()
+    for to_node in to_nodes:
+        for from_node in from_nodes:
+            distance = dijkstra_algorithm.dist_matrix[from_node, to_node]
+            if distance < closest_pair.distance:
+                closest_pair = NodesPair(from_node, to_node, int(distance))
+    return closest_pair
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_find_closest_nodes_pairs(seed):
+    # unit weights give many equally close pairs
+    adjacency_matrix = random_sparse_adjacency_matrix(seed, nodes_number=60, edges_number=100, max_weight=1)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+    rng = np.random.default_rng(seed)
+    queries = [(rng.choice(60, size=rng.integers(0, 6), replace=False).tolist(),
+                set(rng.choice(60, size=rng.integers(0, 20), replace=False).tolist())) for _ in range(20)]
+
+    closest_pairs = DijkstraAlgorithm(adjacency_matrix, lazy=True).find_closest_nodes_pairs(queries)
+    for (from_nodes, to_nodes), closest_pair in zip(queries, closest_pairs):
+        closest_pair_expected = find_closest_nodes_pair_loop(dijkstra_algorithm, from_nodes, to_nodes)
+        assert (closest_pair.from_node, closest_pair.to_node, closest_pair.distance) == \
+               (closest_pair_expected.from_node, closest_pair_expected.to_node, closest_pair_expected.distance)
+        assert closest_pair == dijkstra_algorithm.find_closest_nodes_pair(from_nodes, to_nodes)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("cache_paths", [False, True])
+def test_dijkstra_algorithm_shortest_paths_and_next_hops(seed, cache_paths):
+    adjacency_matrix = random_sparse_adjacency_matrix(seed)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, lazy=True, cache_paths=cache_paths)
+    csgraph = adjacency_matrix.sparce_matrix.toarray()
+
+    for from_node in range(0, 40, 7):
+        next_hops = dijkstra_algorithm.get_next_hops(from_node)
+        for to_node in range(40):
+            nodes_pair = NodesPair(from_node, to_node, dijkstra_algorithm.dist_matrix[from_node, to_node])
+            shortest_path = dijkstra_algorithm.get_shortest_path(nodes_pair)
+            if shortest_path is None:
+                assert next_hops[to_node] == -9999
+                assert dijkstra_algorithm.get_next_hop(from_node, to_node) is None
+                continue
+            path = [from_node] + shortest_path
+            assert np.isclose(sum(csgraph[i, j] for i, j in zip(path, path[1:])), nodes_pair.distance)
+            assert next_hops[to_node] == shortest_path[0] == dijkstra_algorithm.get_next_hop(from_node, to_node)
+            assert (dijkstra_algorithm.get_shortest_path(nodes_pair) is shortest_path) == cache_paths
+
+
+def test_dijkstra_algorithm_cached_paths_are_dropped_with_rows():
+    adjacency_matrix = random_sparse_adjacency_matrix(0)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix, lazy=True, cache_paths=True)
+    nodes_pair = dijkstra_algorithm.find_closest_nodes_pair([0], [10])
+    dijkstra_algorithm.get_next_hops(0)
+    assert 0 in dijkstra_algorithm.paths_cache and 0 in dijkstra_algorithm.next_hops_cache
+
+    dijkstra_algorithm.computed_rows[0] = False
+    dijkstra_algorithm.compute_rows([0])
+    assert 0 not in dijkstra_algorithm.paths_cache and 0 not in dijkstra_algorithm.next_hops_cache
+    assert dijkstra_algorithm.get_shortest_path(nodes_pair) == nodes_pair.shortest_path
+
+
+@pytest.mark.parametrize("width, height, node, neighbors_expected", [
+    (3, 2, 0, [-1, 3, 1, -1]),
+    (3, 2, 4, [1, -1, 5, 3]),
+    (3, 2, 5, [2, -1, -1, 4]),
+    (1, 1, 0, [-1, -1, -1, -1]),
+])
+def test_grid_graph_neighbors(width, height, node, neighbors_expected):
+    grid_graph = GridGraph(width, height)
+    assert grid_graph.neighbors[node].tolist() == neighbors_expected
+    assert grid_graph.get_neighbors(node) == [neighbor for neighbor in neighbors_expected if neighbor != -1]
+    assert [grid_graph.get_neighbor(node, direction) for direction in "NSEW"] == \
+           [None if neighbor == -1 else neighbor for neighbor in neighbors_expected]
+
+
+def test_grid_graph_create_adjacency_matrix():
+    grid_graph = GridGraph(4, 3)
+    grid_graph.block_mask(np.array([[0, 0, 0, 0],
+                                    [0, 1, 1, 0],
+                                    [0, 0, 0, 0]]))
+    grid_graph.block_nodes([3])
+    adjacency_matrix = grid_graph.create_adjacency_matrix()
+
+    array = adjacency_matrix.array
+    assert np.array_equal(array, array.T)
+    assert not array[[3, 5, 6]].any() and not array[:, [3, 5, 6]].any()
+    assert array[0, 1] == array[4, 8] == array[7, 11] == 1
+    assert array[2, 3] == array[7, 3] == 0
+    assert type(create_shortest_paths_algorithm(adjacency_matrix)) is BreadthFirstSearchAlgorithm
+    assert DijkstraAlgorithm(adjacency_matrix).dist_matrix[0, 7] == 6
+
+    grid_graph.unblock_nodes([5, 6])
+    weights = np.arange(12)
+    array = grid_graph.create_adjacency_matrix(weights).array
+    assert array[4, 5] == 5 and array[5, 4] == 4 and array[5, 6] == 6
+    assert not array[3].any()
+
+
+@pytest.mark.parametrize("adjacency_matrix", [
+    create_adjacency_matrix_from_edges([Edge(0, 1), Edge(1, 2, weight=3), Edge(2, 3, directed=True)], 5),
+    create_sparse_adjacency_matrix_from_edges([Edge(0, 1), Edge(1, 2, weight=3), Edge(2, 3, directed=True)], 5),
+])
+def test_adjacency_matrix_checkpoint_rollback(adjacency_matrix):
+    initial_array = adjacency_matrix.array.copy()
+
+    adjacency_matrix.checkpoint()
+    adjacency_matrix.add_edge(Edge(3, 4, weight=2))
+    adjacency_matrix.remove_edge(Edge(0, 1))
+    first_array = adjacency_matrix.array.copy()
+
+    adjacency_matrix.checkpoint()
+    adjacency_matrix.update_edge(Edge(1, 2), 7)
+    adjacency_matrix.add_edge(Edge(0, 4, directed=True))
+    assert adjacency_matrix[1, 2] == 7 and adjacency_matrix[0, 4] == 1
+
+    adjacency_matrix.rollback()
+    assert np.array_equal(adjacency_matrix.array, first_array)
+    adjacency_matrix.rollback()
+    assert np.array_equal(adjacency_matrix.array, initial_array)
+
+
+def test_adjacency_list_checkpoint_rollback():
+    adjacency_list = create_adjacency_list_from_edges([Edge(0, 1), Edge(1, 2, weight=3), Edge(2, 3, directed=True)])
+    initial_nodes_neighbors = {node: dict(neighbors) for node, neighbors in adjacency_list.nodes_neighbors.items()}
+
+    adjacency_list.checkpoint()
+    adjacency_list.add_edge(Edge(3, 4, weight=2))
+    adjacency_list.remove_edge(Edge(1, 2))
+    adjacency_list.add_edge(Edge(1, 2, weight=5))
+    first_nodes_neighbors = {node: dict(neighbors) for node, neighbors in adjacency_list.nodes_neighbors.items()}
+
+    adjacency_list.checkpoint()
+    adjacency_list.remove_edge(Edge(0, 1))
+    adjacency_list[5] = {0: 1}
+    assert adjacency_list[0] == {} and adjacency_list[5] == {0: 1}
+
+    adjacency_list.rollback()
+    assert adjacency_list.nodes_neighbors == first_nodes_neighbors
+    adjacency_list.rollback()
+    assert adjacency_list.nodes_neighbors == initial_nodes_neighbors
+    # neighbors order is restored too
+    assert [list(neighbors) for neighbors in adjacency_list.nodes_neighbors.values()] == \
+           [list(neighbors) for neighbors in initial_nodes_neighbors.values()]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_adjacency_list(seed):
+    rng = np.random.default_rng(seed)
+    edges = [Edge(int(i), int(j), directed=bool(rng.integers(2)), weight=int(rng.integers(1, 5)))
+             for i, j in rng.integers(30, size=(80, 2))]
+    adjacency_list = create_adjacency_list_from_edges(edges)
+    compact_adjacency_list = create_compact_adjacency_list_from_edges(edges)
+    assert isinstance(compact_adjacency_list, CompactAdjacencyList)
+
+    def assert_same_adjacency_lists():
+        assert compact_adjacency_list.nodes == sorted(adjacency_list.nodes)
+        assert compact_adjacency_list.nodes_number == adjacency_list.nodes_number
+        for node in range(35):
+            assert compact_adjacency_list[node] == adjacency_list[node]
+            assert sorted(compact_adjacency_list.neighbors_of(node).tolist()) == sorted(adjacency_list[node] or [])
+
+    assert_same_adjacency_lists()
+    copy_adjacency_list = compact_adjacency_list.copy()
+    compact_adjacency_list.checkpoint()
+    for edge in edges[::3]:
+        adjacency_list.remove_edge(edge)
+        compact_adjacency_list.remove_edge(edge)
+    for edge in [Edge(31, 32), Edge(0, 33, directed=True), Edge(0, 1, weight=9)] + [Edge(0, k) for k in range(2, 12)]:
+        adjacency_list.add_edge(edge)
+        compact_adjacency_list.add_edge(edge)
+    assert_same_adjacency_lists()
+
+    compact_adjacency_list.rollback()
+    for node in range(35):
+        assert compact_adjacency_list[node] == copy_adjacency_list[node]
+
+
+@pytest.mark.skip
+def test_perfs_compact_adjacency_list():
+    R = 10
+    N = 10
+    print()
+    grid_graph = GridGraph(24, 12)
+    edges = [Edge(node, neighbor, directed=True) for node in range(grid_graph.nodes_number)
+             for neighbor in grid_graph.get_neighbors(node)]
+    adjacency_list = create_adjacency_list_from_edges(edges)
+    compact_adjacency_list = create_compact_adjacency_list_from_edges(edges)
+
+    dict_memory = sys.getsizeof(adjacency_list.nodes_neighbors) + sum(
+        sys.getsizeof(neighbors) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in neighbors.items())
+        for neighbors in adjacency_list.nodes_neighbors.values())
+    compact_memory = sum(array.nbytes for array in (compact_adjacency_list.neighbors, compact_adjacency_list.weights,
+                                                   compact_adjacency_list.degrees, compact_adjacency_list.known))
+    print(f"memory dict, compact: {dict_memory}B, {compact_memory}B")
+
+    for name, operation in [
+        ("copy", lambda a: a.copy()),
+        ("nodes", lambda a: a.nodes),
+        ("add/remove edges", lambda a: [(a.add_edge(Edge(0, 1, weight=2)), a.remove_edge(Edge(0, 1)))
+                                        for _ in range(100)]),
+    ]:
+        dict_perf = min(repeat(partial(operation, adjacency_list), repeat=R, number=N)) / N
+        compact_perf = min(repeat(partial(operation, compact_adjacency_list), repeat=R, number=N)) / N
+        print(f"{name} dict, compact: {round(1000 * dict_perf, 3)}ms, {round(1000 * compact_perf, 3)}ms "
+              f"(R = {R}, N = {N})")
+
+    dict_perf = min(repeat(lambda: [list(adjacency_list[node]) for node in range(grid_graph.nodes_number)],
+                           repeat=R, number=N)) / N
+    compact_perf = min(repeat(lambda: [compact_adjacency_list.neighbors_of(node)
+                                       for node in range(grid_graph.nodes_number)], repeat=R, number=N)) / N
+    print(f"neighbors of all nodes dict, compact: {round(1000 * dict_perf, 3)}ms, {round(1000 * compact_perf, 3)}ms "
+          f"(R = {R}, N = {N})")
+
+    # last results (24x12 grid) :
+    # memory dict, compact: 134296B, 14800B
+    # copy dict, compact: 0.706ms, 0.004ms
+    # nodes dict, compact: 0.002ms, 0.006ms
+    # add/remove edges dict, compact: 0.336ms, 0.895ms
+    # neighbors of all nodes dict, compact: 0.091ms, 0.216ms
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_max_flow(seed):
+    rng = np.random.default_rng(seed)
+    edges = [Edge(int(i), int(j), directed=bool(rng.integers(2)), weight=int(rng.integers(1, 5)))
+             for i, j in rng.integers(30, size=(90, 2)) if i != j]
+    adjacency_list = create_adjacency_list_from_edges(edges)
+    sources, sinks = [0, 1], [28, 29]
+
+    # reference : scipy maximum flow with a super source (30) and a super sink (31)
+    capacities = np.zeros((32, 32), dtype=np.int32)
+    for node in adjacency_list.nodes:
+        for neighbor, capacity in adjacency_list[node].items():
+            capacities[node, neighbor] = capacity
+    capacities[30, sources] = capacities[sinks, 31] = 1000
+    value_expected = maximum_flow(csr_matrix(capacities), 30, 31).flow_value
+
+    for algorithm in ["edmonds_karp", "dinic"]:
+        flow = max_flow(adjacency_list, sources, sinks, algorithm=algorithm)
+        assert flow.value == value_expected
+        assert set(sources) <= flow.source_side and not set(sinks) & flow.source_side
+        assert sum(adjacency_list[i][j] for i, j in flow.cut_edges) == value_expected
+
+
+@pytest.mark.parametrize("links, gateways, cuts, agent_node, link_expected", [
+    # the agent is next to a gateway
+    ([(0, 1), (1, 2), (1, 3), (2, 3)], [3], [], 1, (1, 3)),
+    # node 4 is linked to 2 gateways, reached through node 2 linked to a gateway
+    ([(0, 1), (1, 2), (2, 4), (2, 5), (4, 5), (4, 6), (1, 3), (3, 6)], [5, 6], [], 0, (4, 5)),
+    # cutting one of the 2 gateways links of node 4 makes it as dangerous as node 2, which is closer
+    ([(0, 1), (1, 2), (2, 4), (2, 5), (4, 5), (4, 6), (1, 3), (3, 6)], [5, 6], [(4, 5)], 0, (2, 5)),
+    # no gateway can be reached anymore
+    ([(0, 1), (1, 2)], [2], [(1, 2)], 0, None),
+])
+def test_dangerous_links_scorer(links, gateways, cuts, agent_node, link_expected):
+    adjacency_list = create_adjacency_list_from_edges([Edge(i, j) for i, j in links])
+    dangerous_links_scorer = DangerousLinksScorer(adjacency_list, gateways)
+    for i, j in cuts:
+        adjacency_list.remove_edge(Edge(i, j))
+        dangerous_links_scorer.cut(j, i)
+
+    assert dangerous_links_scorer.most_dangerous_link(agent_node) == link_expected
+
+
+def random_undirected_adjacency_list(seed: int, nodes_number: int = 40, edges_number: int = 45):
+    rng = np.random.default_rng(seed)
+    edges = [Edge(int(i), int(j)) for i, j in rng.integers(nodes_number, size=(edges_number, 2)) if i != j]
+    edges.append(Edge(nodes_number - 1, nodes_number - 1))
+    return create_adjacency_list_from_edges(edges)
+
+
+def components_by_bfs(adjacency_list: AdjacencyList, nodes_number: int, removed_nodes=()) -> List[Set[int]]:
+    components, reached = [], set(removed_nodes)
+    for start in range(nodes_number):
+        if start in reached:
+            continue
+        component, stack = {start}, [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in adjacency_list[node] or {}:
+                if neighbor not in reached and neighbor not in component:
+                    component.add(neighbor)
+                    stack.append(neighbor)
+        reached |= component
+        components.append(component)
+    return components
+
+
+def labels_to_components(labels) -> List[Set[int]]:
+    components = {}
+    for node, label in enumerate(labels):
+        if label != -1:
+            components.setdefault(label, set()).add(node)
+    return sorted(components.values(), key=min)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_union_find_and_connected_components(seed):
+    adjacency_list = random_undirected_adjacency_list(seed)
+    components_expected = components_by_bfs(adjacency_list, 40)
+
+    union_find = UnionFind(40)
+    for node in adjacency_list.nodes:
+        for neighbor in adjacency_list[node]:
+            union_find.union(node, neighbor)
+    assert union_find.components_number == len(components_expected)
+    assert labels_to_components(union_find.labels()) == components_expected
+
+    for adjacency in [adjacency_list, create_compact_adjacency_list_from_edges(
+            [Edge(i, j) for i in adjacency_list.nodes for j in adjacency_list[i]])]:
+        components_number, labels = connected_components(adjacency)
+        assert components_number == len(components_expected)
+        assert labels_to_components(labels) == components_expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_articulation_points_and_bridges(seed):
+    adjacency_list = random_undirected_adjacency_list(seed, nodes_number=20, edges_number=30)
+    components_number = len(components_by_bfs(adjacency_list, 20))
+
+    articulation_points, bridges = articulation_points_and_bridges(adjacency_list, nodes_number=20)
+
+    articulation_points_expected = {node for node in range(20)
+                                    if len(components_by_bfs(adjacency_list, 20, [node])) > components_number}
+    assert articulation_points == articulation_points_expected
+    for node in adjacency_list.nodes:
+        for neighbor in list(adjacency_list[node]):
+            if neighbor == node or node > neighbor:
+                continue
+            adjacency_list.remove_edge(Edge(node, neighbor))
+            is_bridge = len(components_by_bfs(adjacency_list, 20)) > components_number
+            adjacency_list.add_edge(Edge(node, neighbor))
+            assert ((node, neighbor) in bridges) == is_bridge
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_components(seed):
+    adjacency_list = random_undirected_adjacency_list(seed, edges_number=60)
+    rng = np.random.default_rng(seed)
+    blocked = set(rng.choice(40, size=5, replace=False).tolist())
+    incremental_components = IncrementalComponents(adjacency_list, blocked=blocked, nodes_number=40)
+
+    for node in rng.integers(40, size=60).tolist():
+        if node in blocked:
+            blocked.remove(node)
+            incremental_components.unblock(node)
+        else:
+            blocked.add(node)
+            incremental_components.block(node)
+
+        components_expected = components_by_bfs(adjacency_list, 40, blocked)
+        assert labels_to_components(incremental_components.labels) == components_expected
+        assert incremental_components.components_number == len(components_expected)
+        assert all(incremental_components.members[incremental_components.labels[min(component)]] == component
+                   for component in components_expected)
+
+
+
+@pytest.mark.parametrize("edges, sources_by_player, owners_expected, dist_expected", [
+    # 0 - 1 - 2 - 3 - 4 with 5 linked to 2, 6 is isolated
+    ([Edge(0, 1), Edge(1, 2), Edge(2, 3), Edge(3, 4), Edge(2, 5)], [[0], [4]],
+     [0, 0, -2, 1, 1, -1, -1], [0, 1, 2, 1, 0, np.inf, np.inf]),
+    ([Edge(0, 1), Edge(1, 2), Edge(2, 3), Edge(3, 4), Edge(2, 5)], [[0], [3]],
+     [0, 0, 1, 1, 1, 1, -1], [0, 1, 1, 0, 1, 2, np.inf]),
+    # a node given to both players is contested
+    ([Edge(0, 1), Edge(1, 2), Edge(2, 3), Edge(3, 4), Edge(2, 5)], [[0, 2], [2, 4]],
+     [0, 0, -2, 1, 1, -1, -1], [0, 1, 0, 1, 0, np.inf, np.inf]),
+    # weighted : 0 -(1)- 1 -(3)- 2 -(1)- 3
+    ([Edge(0, 1, weight=1), Edge(1, 2, weight=3), Edge(2, 3, weight=1)], [[0], [3]],
+     [0, 0, 1, 1, -1, -1, -1], [0, 1, 1, 0, np.inf, np.inf, np.inf]),
+])
+def test_voronoi_partition(edges, sources_by_player, owners_expected, dist_expected):
+    adjacency_matrix = create_sparse_adjacency_matrix_from_edges(edges, 7)
+    territory = voronoi_partition(adjacency_matrix, sources_by_player)
+
+    assert territory.owners.tolist() == owners_expected
+    assert territory.dist.tolist() == dist_expected
+    assert territory.contested_nodes.tolist() == [node for node, owner in enumerate(owners_expected) if owner == -2]
+    assert territory.get_player_nodes(1).tolist() == [node for node, owner in enumerate(owners_expected) if owner == 1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_unit_voronoi_partition_is_weighted_one(seed):
+    rng = np.random.default_rng(seed)
+    grid_graph = GridGraph(12, 8)
+    grid_graph.block_nodes(rng.choice(96, size=20, replace=False).tolist())
+    adjacency_matrix = grid_graph.create_adjacency_matrix()
+    sources_by_player = [rng.choice(96, size=3, replace=False).tolist() for _ in range(3)]
+
+    unit_territory = unit_voronoi_partition(adjacency_matrix, sources_by_player)
+    weighted_territory = weighted_voronoi_partition(adjacency_matrix, sources_by_player)
+    assert np.array_equal(unit_territory.owners, weighted_territory.owners)
+    assert np.array_equal(unit_territory.dist, weighted_territory.dist)
+    assert sum(unit_territory.count_nodes().values()) == 96
+
+
+def random_grid_adjacency_matrix(seed: int, width: int = 24, height: int = 12, walls_number: int = 60):
+    rng = np.random.default_rng(seed)
+    grid_graph = GridGraph(width, height)
+    grid_graph.block_nodes(rng.choice(grid_graph.nodes_number, size=walls_number, replace=False).tolist())
+    weights = rng.integers(1, 4, size=grid_graph.nodes_number)
+    return grid_graph.create_adjacency_matrix(weights)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_single_pair_searches(seed):
+    adjacency_matrix = random_grid_adjacency_matrix(seed)
+    csgraph = adjacency_matrix.sparce_matrix.toarray()
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+    searches = [AStarSearch(adjacency_matrix), AStarSearch(adjacency_matrix, manhattan_heuristic(24)),
+                AStarSearch(adjacency_matrix, euclidean_heuristic(24)), BidirectionalDijkstraSearch(adjacency_matrix)]
+
+    rng = np.random.default_rng(seed)
+    for from_node, to_node in rng.integers(24 * 12, size=(30, 2)).tolist() + [(5, 5)]:
+        distance_expected = dijkstra_algorithm.dist_matrix[from_node, to_node]
+        for search in searches:
+            nodes_pair = search.find_shortest_path(from_node, to_node)
+            assert (nodes_pair.from_node, nodes_pair.to_node) == (from_node, to_node)
+            assert nodes_pair.distance == distance_expected
+            if distance_expected in (0, np.inf):
+                assert nodes_pair.shortest_path is None
+                continue
+            path = [from_node] + nodes_pair.shortest_path
+            assert path[-1] == to_node
+            assert sum(csgraph[i, j] for i, j in zip(path, path[1:])) == distance_expected
+
+
+@pytest.mark.skip
+def test_perfs_single_pair_searches():
+    print()
+    adjacency_matrix = random_grid_adjacency_matrix(0, walls_number=40)
+    nodes_number = 24 * 12
+    searches = {
+        "dijkstra": AStarSearch(adjacency_matrix),
+        "a* manhattan": AStarSearch(adjacency_matrix, manhattan_heuristic(24)),
+        "bidirectional dijkstra": BidirectionalDijkstraSearch(adjacency_matrix),
+    }
+    pairs = np.random.default_rng(0).integers(nodes_number, size=(200, 2)).tolist()
+
+    print(f"all pairs dijkstra: {nodes_number} expanded nodes per query (row), {nodes_number ** 2} for the matrix")
+    for name, search in searches.items():
+        expanded_nodes = []
+        start = time.perf_counter()
+        for from_node, to_node in pairs:
+            search.find_shortest_path(from_node, to_node)
+            expanded_nodes.append(search.expanded_nodes)
+        duration = (time.perf_counter() - start) / len(pairs)
+        print(f"{name}: {round(np.mean(expanded_nodes), 1)} expanded nodes per query, {round(1000 * duration, 3)}ms")
+
+    start = time.perf_counter()
+    DijkstraAlgorithm(adjacency_matrix)
+    print(f"all pairs dijkstra matrix: {round(1000 * (time.perf_counter() - start), 3)}ms")
+
+    # last results (24x12 grid, 40 walls, weights from 1 to 3) :
+    # all pairs dijkstra: 288 expanded nodes per query (row), 82944 for the matrix
+    # dijkstra: 117.5 expanded nodes per query, 0.193ms
+    # a* manhattan: 76.7 expanded nodes per query, 0.179ms
+    # bidirectional dijkstra: 55.2 expanded nodes per query, 0.158ms
+    # all pairs dijkstra matrix: 9.78ms
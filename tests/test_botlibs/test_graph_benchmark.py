@@ -0,0 +1,119 @@
+from timeit import repeat
+from typing import Callable, Dict, List, Tuple
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from botlibs.graph.algorithms import DijkstraAlgorithm
+from botlibs.graph.classes import Edge, NodesPair
+from botlibs.graph.create import create_adjacency_matrix_from_edges, create_adjacency_list_from_edges
+from botlibs.graph.grid import GridGraph
+from tests.constants import TESTS_RES_PATH
+
+
+BENCHMARK_BASELINE_PATH = TESTS_RES_PATH / "benchmarks" / "graph.json"
+NODES_NUMBERS = [50, 500, 5000]
+# timings are the best of R runs of N calls, N being set so that a run lasts about MIN_RUN_DURATION
+R = 5
+MIN_RUN_DURATION = 0.02
+# small timings and memories are too noisy to be compared relatively
+MIN_COMPARED_DURATION_MS = 0.05
+MIN_COMPARED_PEAK_KB = 64
+
+
+def grid_edges(nodes_number: int) -> Tuple[List[Edge], int]:
+    width = int(np.sqrt(nodes_number))
+    grid_graph = GridGraph(width, nodes_number // width)
+    edges = [Edge(node, neighbor, directed=True) for node in range(grid_graph.nodes_number)
+             for neighbor in grid_graph.get_neighbors(node)]
+    return edges, grid_graph.nodes_number
+
+
+def random_sparse_edges(nodes_number: int, mean_degree: int = 4) -> Tuple[List[Edge], int]:
+    rng = np.random.default_rng(nodes_number)
+    edges = [Edge(int(i), int(j), weight=int(rng.integers(1, 10)))
+             for i, j in rng.integers(nodes_number, size=(nodes_number * mean_degree // 2, 2)) if i != j]
+    return edges, nodes_number
+
+
+GRAPHS_GENERATORS = {"grid": grid_edges, "random_sparse": random_sparse_edges}
+
+
+def measure(operation: Callable[[], object]) -> Dict[str, float]:
+    start = time.perf_counter()
+    operation()
+    number = max(1, int(MIN_RUN_DURATION / max(time.perf_counter() - start, 1e-9)))
+    duration = min(repeat(operation, repeat=R, number=number)) / number
+
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time_ms": round(1000 * duration, 4), "peak_kb": round(peak / 1024, 1)}
+
+
+def run_graph_benchmark(graph_name: str, nodes_number: int) -> Dict[str, Dict[str, float]]:
+    edges, nodes_number = GRAPHS_GENERATORS[graph_name](nodes_number)
+    adjacency_matrix = create_adjacency_matrix_from_edges(edges, nodes_number)
+    adjacency_list = create_adjacency_list_from_edges(edges)
+    dijkstra_algorithm = DijkstraAlgorithm(adjacency_matrix)
+
+    rng = np.random.default_rng(0)
+    from_nodes = rng.choice(nodes_number, size=5, replace=False).tolist()
+    to_nodes = rng.choice(nodes_number, size=min(50, nodes_number), replace=False).tolist()
+    nodes_pair = dijkstra_algorithm.find_closest_nodes_pair(from_nodes, to_nodes)
+    far_node = int(np.argmax(np.where(np.isfinite(dijkstra_algorithm.dist_matrix[0]),
+                                      dijkstra_algorithm.dist_matrix[0], -1)))
+    far_nodes_pair = NodesPair(0, far_node, dijkstra_algorithm.dist_matrix[0, far_node])
+
+    operations = {
+        "create_adjacency_matrix_from_edges": lambda: create_adjacency_matrix_from_edges(edges, nodes_number),
+        "AdjacencyMatrix.sparce_matrix": lambda: adjacency_matrix.sparce_matrix,
+        "DijkstraAlgorithm": lambda: DijkstraAlgorithm(adjacency_matrix),
+        "DijkstraAlgorithm.find_closest_nodes_pair": lambda: dijkstra_algorithm.find_closest_nodes_pair(from_nodes,
+                                                                                                         to_nodes),
+        "DijkstraAlgorithm.get_shortest_path": lambda: (dijkstra_algorithm.get_shortest_path(nodes_pair),
+                                                        dijkstra_algorithm.get_shortest_path(far_nodes_pair)),
+        "AdjacencyList.copy": lambda: adjacency_list.copy(),
+    }
+    return {f"{graph_name}/{nodes_number}/{name}": measure(operation) for name, operation in operations.items()}
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                     tolerance: float) -> List[str]:
+    regressions = []
+    for key, measures in results.items():
+        if key not in baseline:
+            continue
+        for measure_name, min_compared in [("time_ms", MIN_COMPARED_DURATION_MS), ("peak_kb", MIN_COMPARED_PEAK_KB)]:
+            value, baseline_value = measures[measure_name], baseline[key][measure_name]
+            if value > tolerance * max(baseline_value, min_compared):
+                regressions.append(f"{key} {measure_name}: {value} (baseline {baseline_value})")
+    return regressions
+
+
+@pytest.mark.benchmark
+def test_graph_benchmark(request):
+    print()
+    results = {}
+    for graph_name in GRAPHS_GENERATORS:
+        for nodes_number in NODES_NUMBERS:
+            results.update(run_graph_benchmark(graph_name, nodes_number))
+
+    key_width = max(len(key) for key in results)
+    for key, measures in results.items():
+        print(f"{key:<{key_width}}  {measures['time_ms']:>10.4f}ms  {measures['peak_kb']:>10.1f}kB")
+
+    if request.config.getoption("--benchmark_save"):
+        BENCHMARK_BASELINE_PATH.parent.mkdir(exist_ok=True, parents=True)
+        with open(BENCHMARK_BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+        return
+
+    with open(BENCHMARK_BASELINE_PATH) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(results, baseline, tolerance=request.config.getoption("--benchmark_tolerance"))
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,163 @@
+from copy import copy, deepcopy
+from timeit import repeat
+import math
+import tracemalloc
+
+import pytest
+
+from botlibs.trigonometry import Point, Vector, FrozenPoint, FrozenVector, VectorHashMap
+
+
+class DictPoint:
+    # previous __dict__ based implementation, reference for the benchmarks
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __add__(self, other):
+        if isinstance(other, DictPoint):
+            return DictVector(self.x + other.x, self.y + other.y)
+        else:
+            return DictPoint(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        if isinstance(other, DictPoint):
+            return DictVector(self.x - other.x, self.y - other.y)
+        else:
+            return DictPoint(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, nombre):
+        return DictPoint(nombre * self.x, nombre * self.y)
+
+    def __rmul__(self, nombre):
+        return self * nombre
+
+    def __hash__(self):
+        return (self.x, self.y).__hash__()
+
+    def dist(self, point):
+        return math.dist([self.x, self.y], [point.x, point.y])
+
+
+class DictVector(DictPoint):
+    def __mul__(self, nombre):
+        return DictVector(nombre * self.x, nombre * self.y)
+
+    def dot(self, vector):
+        return self.x * vector.x + self.y * vector.y
+
+    @property
+    def norm2(self):
+        return self.dot(self)
+
+
+@pytest.mark.parametrize("point_type, vector_type", [(Point, Vector), (FrozenPoint, FrozenVector)])
+def test_operations(point_type, vector_type):
+    p, q = point_type(1, 2), point_type(4, 6)
+    v = vector_type(3, 4)
+
+    assert type(q - p) is vector_type and q - p == vector_type(3, 4)
+    assert type(p + v) is vector_type and p + v == point_type(4, 6)
+    assert type(2 * p) is point_type and 2 * p == point_type(2, 4)
+    assert type(v * 2) is vector_type and type(2 * v) is vector_type and v * 2 == vector_type(6, 8)
+    rounded_point = round(point_type(1.26, 2.5), 1)
+    assert type(rounded_point) is point_type and rounded_point == point_type(1.3, 2.5)
+    assert type(round(v)) is vector_type
+    assert p.dist(q) == 5 and v.norm2 == 25 and v.norm == 5 and v.dot(vector_type(1, -1)) == -1
+    assert hash(p) == hash((1, 2)) and hash(v) == hash(Vector(3, 4)) == hash(FrozenVector(3, 4))
+
+
+def test_mixed_families():
+    assert Point(1, 2) == FrozenPoint(1, 2) and FrozenPoint(1, 2) == Point(1, 2)
+    assert type(Point(1, 2) - FrozenPoint(0, 0)) is Vector
+    assert type(FrozenPoint(1, 2) + Vector(0, 0)) is FrozenVector
+    assert len({Point(1, 2), FrozenPoint(1, 2)}) == 1
+
+
+def test_slots():
+    for point in [Point(1, 2), Vector(1, 2), FrozenPoint(1, 2), FrozenVector(1, 2)]:
+        assert not hasattr(point, "__dict__")
+        with pytest.raises(AttributeError):
+            point.z = 3
+
+
+def test_in_place_operations():
+    p = Point(1, 2)
+    q = p
+    p += Vector(1, 1)
+    p -= Point(0, 1)
+    p *= 2
+    assert p is q and type(p) is Point and p == Point(4, 4)
+
+    v = FrozenVector(1, 2)
+    w = v
+    v += Vector(1, 1)
+    v *= 2
+    assert v is not w and type(v) is FrozenVector and v == Vector(4, 6) and w == Vector(1, 2)
+    with pytest.raises(AttributeError):
+        w.x = 0
+
+
+@pytest.mark.parametrize("point", [Point(1, 2), Vector(1, 2), FrozenPoint(1, 2), FrozenVector(1, 2)])
+def test_copy(point):
+    for copied_point in [copy(point), deepcopy(point)]:
+        assert type(copied_point) is type(point) and copied_point == point
+
+
+@pytest.mark.skip
+def test_perfs_points():
+    R = 10
+    N = 20
+    K = 1000
+    print()
+
+    def move_to(position, target, speed, norms):
+        vector_to_target = target - position
+        distance_to_target = norms[vector_to_target]
+        return position + (speed / distance_to_target) * vector_to_target
+
+    def move_to_in_place(position, target, speed, norms):
+        vector_to_target = target - position
+        distance_to_target = norms[vector_to_target]
+        vector_to_target *= speed / distance_to_target
+        position += vector_to_target
+        return position
+
+    def is_collision(xd, yd, xm, ym, vector_type, norms2):
+        return norms2[vector_type(xm - xd, ym - yd)]
+
+    families = [("dict", DictPoint, DictVector), ("slots", Point, Vector), ("frozen", FrozenPoint, FrozenVector)]
+    for name, point_type, vector_type in families:
+        norms = VectorHashMap(func_to_cache=lambda v: math.sqrt(v.norm2))
+        norms2 = VectorHashMap(func_to_cache=lambda v: v.norm2)
+        points = [point_type(i, 2 * i + 1) for i in range(K)]
+        target = point_type(8000, 4500)
+
+        timings = {
+            # positions are new points, like the entities position properties
+            "move_to": lambda: [move_to(point_type(point.x, point.y), target, 400, norms) for point in points],
+            "evaluate_monsters_to_avoid": lambda: [norms2[target - point] for point in points],
+            "is_collision": lambda: [is_collision(point.x, point.y, 8000, 4500, vector_type, norms2)
+                                     for point in points],
+            "dist": lambda: [point.dist(target) for point in points],
+        }
+        if point_type is Point:
+            timings["move_to_in_place"] = lambda: [move_to_in_place(point_type(point.x, point.y), target, 400, norms)
+                                                   for point in points]
+        perfs = {key: round(1000 * min(repeat(timing, repeat=R, number=N)) / N, 3)
+                 for key, timing in timings.items()}
+
+        kept_points = [None] * K
+        tracemalloc.start()
+        for i in range(K):
+            kept_points[i] = point_type(1, 2)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept_points
+        print(f"{name}: {perfs} ms per {K} points, {round(size / K)} bytes per point")
+
+    # last results (ms per 1000 points, bytes per point)
+    # dict: move_to 2.699, evaluate_monsters_to_avoid 0.751, is_collision 0.687, dist 0.269, 88 bytes
+    # slots: move_to 2.233, evaluate_monsters_to_avoid 0.757, is_collision 0.684, dist 0.144, move_to_in_place 1.436,
+    # 48 bytes
+    # frozen: move_to 3.725, evaluate_monsters_to_avoid 0.997, is_collision 0.829, dist 0.431, 64 bytes
@@ -1,6 +1,8 @@
+import ast
+
 import pytest
 
-from builderlibs.aggregater import LocalModuleReplacer
+from builderlibs.aggregater import LocalModuleReplacer, find_import_from_paths
 from tests.constants import TESTS_RES_PATH, TESTS_SHAREDLIBS_PATH, TESTS_DATA_PATH
 
 
@@ -40,3 +42,23 @@ def test_challenge_build(test_challenge):
     challenge_source = test_challenge.aggregate_to_source(local_packages_paths=[TESTS_SHAREDLIBS_PATH])
     with open(TESTS_DATA_PATH / (test_challenge.name + ".py"), "w") as f:
         f.write(challenge_source)
+
+
+def test_find_import_from_paths():
+    tree = ast.parse("""
+from a import b
+import c
+
+
+def f():
+    if c:
+        from d import e
+    try:
+        pass
+    except ImportError:
+        from g import h
+""")
+    paths = find_import_from_paths(tree)
+
+    assert paths == [[("body", 0)], [("body", 2), ("body", 0), ("body", 0)],
+                     [("body", 2), ("body", 1), ("handlers", 0), ("body", 0)]]
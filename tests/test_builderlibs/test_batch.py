@@ -0,0 +1,70 @@
+from shutil import copytree
+
+import pytest
+
+from builderlibs.batch import find_challenges, build_challenge, build_challenges, format_builds_summary, ChallengeBuild
+from builderlibs.cache import PARSE_CACHE
+from tests.constants import TESTS_BOTS_PATH, TESTS_SHAREDLIBS_PATH
+
+
+@pytest.fixture
+def bots_path(tmp_path):
+    for name in ["test_challenge", "test_challenge_copy"]:
+        copytree(TESTS_BOTS_PATH / "test_challenge", tmp_path / "bots" / name)
+    broken_challenge_path = tmp_path / "bots" / "broken_challenge"
+    broken_challenge_path.mkdir()
+    (broken_challenge_path / "bot.py").write_text("def broken(:\n")
+    (tmp_path / "bots" / "not_a_challenge").mkdir()
+    return tmp_path / "bots"
+
+
+def test_find_challenges(bots_path):
+    assert find_challenges(TESTS_BOTS_PATH) == ["test_challenge"]
+    assert find_challenges(bots_path) == ["broken_challenge", "test_challenge", "test_challenge_copy"]
+
+
+def test_build_challenges(bots_path, tmp_path):
+    names = find_challenges(bots_path)
+    builds = build_challenges(names=names, parent=bots_path, local_packages_paths=[TESTS_SHAREDLIBS_PATH],
+                              cache_directory=tmp_path / "cache", max_workers=2)
+
+    assert [build.name for build in builds] == names
+    builds_by_name = {build.name: build for build in builds}
+
+    assert not builds_by_name["broken_challenge"].succeeded
+    assert "SyntaxError" in builds_by_name["broken_challenge"].error
+    assert not (bots_path / "broken_challenge_built.py").exists()
+
+    for name in ["test_challenge", "test_challenge_copy"]:
+        assert builds_by_name[name].succeeded
+        assert "class AnotherClass" in (bots_path / f"{name}_built.py").read_text()
+
+
+def test_build_challenges_without_cache(bots_path, tmp_path):
+    builds = build_challenges(names=["test_challenge"], parent=bots_path, local_packages_paths=[TESTS_SHAREDLIBS_PATH],
+                              cache_directory=tmp_path / "cache", max_workers=1, use_cache=False)
+
+    assert builds[0].succeeded
+    assert not (tmp_path / "cache").exists()
+
+
+def test_build_challenge_without_parse_cache(bots_path, tmp_path):
+    PARSE_CACHE.clear()
+    build = build_challenge(name="test_challenge", parent=bots_path, local_packages_paths=[TESTS_SHAREDLIBS_PATH],
+                            cache_directory=tmp_path / "cache", use_cache=False)
+
+    assert build.succeeded
+    assert PARSE_CACHE.hits == 0 and PARSE_CACHE.misses > 0
+    assert PARSE_CACHE.enabled
+    assert not (tmp_path / "cache").exists()
+
+
+def test_format_builds_summary():
+    builds = [ChallengeBuild(name="challenge", duration=0.5, size=1024),
+              ChallengeBuild(name="other_challenge", duration=0.25, error="ValueError: error")]
+
+    summary = format_builds_summary(builds, total_duration=0.5).splitlines()
+
+    assert summary[0].split() == ["challenge", "500.0ms", "ok", "(1024", "bytes)"]
+    assert summary[1].split() == ["other_challenge", "250.0ms", "FAILED", "(ValueError:", "error)"]
+    assert summary[2].split() == ["total", "500.0ms", "1", "built,", "1", "failed"]
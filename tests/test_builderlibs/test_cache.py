@@ -0,0 +1,64 @@
+import ast
+from shutil import copytree
+
+import pytest
+
+from builderlibs.cache import BuildCache
+from builderlibs.challenge import ChallengeFolder
+from tests.constants import TESTS_BOTS_PATH, TESTS_SHAREDLIBS_PATH
+
+
+@pytest.fixture
+def copied_challenge(tmp_path) -> ChallengeFolder:
+    copytree(TESTS_BOTS_PATH / "test_challenge", tmp_path / "bots" / "test_challenge")
+    copytree(TESTS_SHAREDLIBS_PATH, tmp_path / "sharedlibs")
+    return ChallengeFolder(name="test_challenge", parent=tmp_path / "bots")
+
+
+def test_build_cache_load_tree(tmp_path):
+    module_path = tmp_path / "module.py"
+    module_path.write_text("CONSTANT = 1\n")
+
+    build_cache = BuildCache(directory=tmp_path / "cache")
+    tree = build_cache.load_tree(module_path)
+    build_cache.update_imports(module_path, [("math", 0, None)], [[("body", 0)]])
+    build_cache.save()
+    assert (build_cache.hits, build_cache.misses) == (0, 1)
+
+    reloaded_cache = BuildCache(directory=tmp_path / "cache")
+    reloaded_tree = reloaded_cache.load_tree(module_path)
+    assert (reloaded_cache.hits, reloaded_cache.misses) == (1, 0)
+    assert ast.dump(reloaded_tree) == ast.dump(tree)
+    assert reloaded_cache.get_entry(module_path).imports == [("math", 0, None)]
+
+    module_path.write_text("CONSTANT = 2\n")
+    modified_cache = BuildCache(directory=tmp_path / "cache")
+    assert modified_cache.get_entry(module_path) is None
+    modified_cache.load_tree(module_path)
+    assert (modified_cache.hits, modified_cache.misses) == (0, 1)
+
+
+def test_build_cache_aggregate_to_source(copied_challenge, tmp_path):
+    local_packages_paths = [tmp_path / "sharedlibs"]
+    source_expected = copied_challenge.aggregate_to_source(local_packages_paths=local_packages_paths)
+
+    first_cache = BuildCache(directory=tmp_path / "cache")
+    assert copied_challenge.aggregate_to_source(local_packages_paths, first_cache) == source_expected
+    assert first_cache.hits == 0
+    assert first_cache.reprocessed == first_cache.misses
+
+    second_cache = BuildCache(directory=tmp_path / "cache")
+    assert copied_challenge.aggregate_to_source(local_packages_paths, second_cache) == source_expected
+    assert (second_cache.hits, second_cache.misses) == (0, 0)
+
+    module_path = copied_challenge.challenge_structure.libs.path / "module.py"
+    module_path.write_text(module_path.read_text().replace('"constant"', '"modified"'))
+
+    third_cache = BuildCache(directory=tmp_path / "cache")
+    source_modified = copied_challenge.aggregate_to_source(local_packages_paths, third_cache)
+    assert "modified" in source_modified
+    assert third_cache.misses == 1
+    assert third_cache.hits > 0
+    # only the modified module is visited again, the others are replaced at their cached imports paths
+    assert third_cache.reprocessed == 1
+    assert source_modified == copied_challenge.aggregate_to_source(local_packages_paths=local_packages_paths)
@@ -1,10 +1,12 @@
 import ast
+from unittest.mock import patch
 from pathlib import Path
 from typing import Dict
 
 import pytest
 
-from builderlibs.dependencies import Module, LocalModule, Import, ImportFrom
+from builderlibs.dependencies import Module, LocalModule, Import, ImportFrom, ImportResolutionIndex
+from builderlibs.cache import ParseCache
 from tests.constants import TESTS_RES_PATH
 
 BASE_PATH = Path(__file__).resolve()
@@ -79,3 +81,44 @@ def test_local_module(python_file, test_challenge):
 
     assert local_module.file_path == python_file.path
     assert isinstance(local_module.tree, ast.Module)
+
+
+def test_parse_cache(tmp_path):
+    module_path = tmp_path / "module.py"
+    module_path.write_text("CONSTANT = 1\n")
+    parse_cache = ParseCache()
+
+    tree = parse_cache.get_tree(module_path)
+    tree.body.clear()
+    other_tree = parse_cache.get_tree(module_path)
+    assert (parse_cache.hits, parse_cache.misses) == (1, 1)
+    assert len(other_tree.body) == 1
+    assert parse_cache.get_tree(module_path, copy=False) is parse_cache.get_tree(module_path, copy=False)
+
+    module_path.write_text("CONSTANT = 10\n")
+    modified_tree = parse_cache.get_tree(module_path)
+    assert parse_cache.misses == 2
+    assert modified_tree.body[0].value.value == 10
+
+
+@pytest.mark.parametrize("module_name, imported_from, level", [
+    ("math", "main_file", 0),
+    ("challengelibs.module", "main_file", 0),
+    ("another_module", "libs_init_file", 1),
+    ("sharedlibs.module", "main_file", 2),
+    ("sharedlibs", "sharedlibs", 0),
+    ("challengelibs", "main_file", 0)
+])
+def test_import_resolution_index(module_name, imported_from, level, imported_from_paths, test_challenge):
+    imported_from = imported_from_paths[imported_from]
+    index = ImportResolutionIndex(roots=[test_challenge.challenge_structure.root.path, TESTS_RES_PATH / "sharedlibs"])
+    module_expected = Module(name=module_name, imported_from=imported_from, level=level)
+
+    module = Module(name=module_name, imported_from=imported_from, level=level, index=index)
+    assert module.target == module_expected.target
+    assert module.is_local == module_expected.is_local
+
+    with patch("builderlibs.dependencies.os.listdir") as mock_listdir:
+        cached_module = Module(name=module_name, imported_from=imported_from, level=level, index=index)
+        mock_listdir.assert_not_called()
+    assert cached_module.target == module_expected.target
@@ -1,6 +1,16 @@
+import ast
+import subprocess
+import sys
+
 import pytest
 
-from builderlibs.optimizer import optimize_imports_nodes
+from builderlibs.challenge import ChallengeFolder
+from builderlibs.optimizer import (optimize_imports_nodes, ReferencesGraph, remove_dead_code, flatten_modules,
+                                   fold_constants, make_imports_lazy)
+from tests.constants import TESTS_ROOT_PATH
+from tests.test_bots.fall_challenge_2024.test_bot import TEST_INPUTS
+
+ROOT_PATH = TESTS_ROOT_PATH.parent
 
 
 @pytest.mark.skip("Test is not implemented")
@@ -59,13 +69,287 @@ def test_optimize_imports_nodes(create_ast_imports_nodes_from_sources):
     # TODO : assert  optimized_nodes and expected_nodes are the same
 
 
-@pytest.mark.skip("Test is not implemented")
-def test_used_visitor_visit():
-    # TODO : test UsedVisitor.visit()
+@pytest.mark.parametrize("source, reachable_names_expected", [
+    ("def f():\n    return g()\ndef g():\n    pass\nf()", {"f", "g"}),
+    ("def f():\n    return g()\ndef g():\n    pass\ng()", {"g"}),
+    ("def f():\n    return g()\ndef g():\n    return f()\nx = 1", {"x"}),
+    ("class A:\n    pass\nclass B(A):\n    pass\nb = B()", {"A", "B", "b"})
+])
+def test_references_graph_reachable_names(source, reachable_names_expected):
+    references_graph = ReferencesGraph(ast.parse(source))
+
+    assert references_graph.reachable_names() == reachable_names_expected
+
+
+def test_remove_dead_code():
+    source = """
+def unused():
+    return used_by_unused()
+
+
+def used_by_unused():
     pass
 
 
-@pytest.mark.skip("Test is not implemented")
-def test_used_remover_visit():
-    # TODO : test UnusedRemover.visit()
+def used():
+    def nested_used():
+        pass
+
+    def nested_unused():
+        pass
+
+    return nested_used()
+
+
+class Class:
+    def method(self):
+        pass
+
+    class NestedUnused:
+        pass
+
+
+Class().method()
+used()
+"""
+    source_expected = """
+def used():
+    def nested_used():
+        pass
+
+    def nested_unused():
+        pass
+
+    return nested_used()
+
+
+class Class:
+    def method(self):
+        pass
+
+    class NestedUnused:
+        pass
+
+
+Class().method()
+used()
+"""
+    tree = remove_dead_code(ast.parse(source))
+
+    assert ast.unparse(tree) == ast.unparse(ast.parse(source_expected))
+
+
+def test_remove_dead_code_aggressive():
+    source = """
+from enum import Enum
+
+
+class Color(Enum):
+    RED = 0
+    BLUE = 1
+
+
+class Base:
+    UNUSED_ATTRIBUTE = 0
+    USED_ATTRIBUTE = 1
+
+    def __init__(self):
+        self.value = self.USED_ATTRIBUTE
+
+    def used_method(self):
+        return helper()
+
+    def unused_method(self):
+        return unused_helper()
+
+    @property
+    def used_property(self):
+        return self.value
+
+    @property
+    def unused_property(self):
+        return self.value
+
+
+class Child(Base):
+    def dynamic_method(self):
+        pass
+
+
+def helper():
+    return Color.RED
+
+
+def unused_helper():
     pass
+
+
+child = Child()
+child.used_method()
+getattr(child, "dynamic_method")()
+print(child.used_property)
+"""
+    source_expected = """
+from enum import Enum
+
+
+class Color(Enum):
+    RED = 0
+    BLUE = 1
+
+
+class Base:
+    USED_ATTRIBUTE = 1
+
+    def __init__(self):
+        self.value = self.USED_ATTRIBUTE
+
+    def used_method(self):
+        return helper()
+
+    @property
+    def used_property(self):
+        return self.value
+
+
+class Child(Base):
+    def dynamic_method(self):
+        pass
+
+
+def helper():
+    return Color.RED
+
+
+child = Child()
+child.used_method()
+getattr(child, "dynamic_method")()
+print(child.used_property)
+"""
+    tree = remove_dead_code(ast.parse(source), aggressive=True)
+
+    assert ast.unparse(tree) == ast.unparse(ast.parse(source_expected))
+
+    not_aggressive_tree = remove_dead_code(ast.parse(source), aggressive=False)
+    assert "unused_method" in ast.unparse(not_aggressive_tree)
+
+
+@pytest.mark.parametrize("aggressive", [False, True])
+def test_remove_dead_code_keeps_nested_definitions(aggressive):
+    source = """
+class A:
+    class Config:
+        X = 1
+
+    def f(self):
+        return self.Config.X
+
+
+def g(flag):
+    if flag:
+        def h():
+            pass
+    return flag
+
+
+result = (A().f(), A.Config.X, g(True))
+"""
+    tree = remove_dead_code(ast.parse(source), aggressive=aggressive)
+
+    namespace = {}
+    exec(compile(tree, "<test>", "exec"), namespace)
+    assert namespace["result"] == (1, 1, True)
+
+
+def test_flatten_modules():
+    tree = ast.Module(body=[ast.Module(body=[ast.parse("a = 1").body[0],
+                                             ast.Module(body=ast.parse("b = a").body, type_ignores=[])],
+                                       type_ignores=[]),
+                            ast.parse("c = b").body[0]],
+                      type_ignores=[])
+
+    assert ast.unparse(flatten_modules(tree)) == "a = 1\nb = a\nc = b"
+    assert all(not isinstance(statement, ast.Module) for statement in tree.body)
+
+
+@pytest.mark.parametrize("source, source_expected", [
+    ("from typing import Final\nX_MAX = 3\nX: Final = [i ** 2 for i in range(X_MAX)]\nY = X",
+     "from typing import Final\nX_MAX = 3\nX = [0, 1, 4]\nY = X"),
+    ("import typing\nX: typing.Final[dict] = {str(i): (i, i / 2) for i in range(2)}",
+     "import typing\nX = {'0': (0, 0.0), '1': (1, 0.5)}"),
+    ("from typing import Final\ndef f(x):\n    return {x, -x}\nX: Final = f(1)",
+     "from typing import Final\ndef f(x):\n    return {x, -x}\nX = {1, -1}"),
+    ("import numpy as np\nfrom typing import Final\nX: Final = np.arange(3).reshape((1, 3))\n"
+     "Y: Final = np.ones((2, 2)) / 3\nZ: Final = np.float64(0.5)",
+     "import numpy as np\nfrom typing import Final\nX = np.array([[0, 1, 2]], dtype='int64')\n"
+     "Y = np.full((2, 2), 0.3333333333333333, dtype='float64')\nZ = np.float64(0.5)"),
+    ("from typing import Final\nclass A:\n    pass\nX: Final = A()\nY: Final = float('inf')",
+     "from typing import Final\nclass A:\n    pass\nX: Final = A()\nY: Final = float('inf')"),
+    ("from typing import Final\nN = int(input())\nX: Final = N + 1\nY: Final = 1 + 1\nprint(Y)",
+     "from typing import Final\nN = int(input())\nX: Final = N + 1\nY = 2\nprint(Y)"),
+    ("X: int = 1 + 1", "X: int = 1 + 1"),
+    ("from typing import Final\ndef f():\n    return Y\nY = [1]\nY[0] = 2\nX: Final = f()",
+     "from typing import Final\ndef f():\n    return Y\nY = [1]\nY[0] = 2\nX = [2]"),
+])
+def test_fold_constants(source, source_expected):
+    tree = fold_constants(ast.parse(source))
+    assert ast.unparse(tree) == ast.unparse(ast.parse(source_expected))
+    compile(ast.fix_missing_locations(tree), "test", "exec")
+
+
+def test_fold_constants_evaluates_dependencies_only(capsys):
+    source = ("from typing import Final\nimport sys\nLOGGER = print('side effect', file=sys.stdout)\n"
+              "def log():\n    print('side effect')\nLOG = log()\nN = 2\nX: Final = N * 3")
+    tree = fold_constants(ast.parse(source))
+
+    assert ast.unparse(tree).endswith("X = 6")
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("source, source_expected", [
+    ("from scipy.sparse import csr_matrix, eye\nimport numpy as np\n"
+     "def f(a) -> csr_matrix:\n    return csr_matrix(a)\n"
+     "class A:\n    m: csr_matrix\n    def g(self, b: csr_matrix):\n        return [eye(i) for i in b]",
+     "import numpy as np\n"
+     "def f(a) -> 'csr_matrix':\n    from scipy.sparse import csr_matrix\n    return csr_matrix(a)\n"
+     "class A:\n    m: 'csr_matrix'\n    def g(self, b: 'csr_matrix'):\n        from scipy.sparse import eye\n"
+     "        return [eye(i) for i in b]"),
+    ("import scipy.sparse\nfrom scipy.sparse.csgraph import dijkstra as d\n"
+     "def f(a):\n    def g():\n        return d(a)\n    return scipy.sparse.csr_matrix(g())",
+     "def f(a):\n    from scipy.sparse.csgraph import dijkstra as d\n    import scipy.sparse\n"
+     "    def g():\n        return d(a)\n    return scipy.sparse.csr_matrix(g())"),
+    ("from scipy.sparse import csr_matrix, eye\nEYE = eye(2)\n"
+     "def f(a, m=csr_matrix):\n    return m(a) + EYE",
+     "from scipy.sparse import csr_matrix, eye\nEYE = eye(2)\n"
+     "def f(a, m=csr_matrix):\n    return m(a) + EYE"),
+    ("from scipy.sparse import csr_matrix\ndef f(csr_matrix):\n    return csr_matrix",
+     "def f(csr_matrix):\n    return csr_matrix"),
+    ("from numpy import array\ndef f(a):\n    return array(a)", "from numpy import array\ndef f(a):\n    return array(a)"),
+    ("from scipy.sparse import eye\ndef f(n):\n    \"\"\"identity\"\"\"\n    return eye(n)",
+     "def f(n):\n    \"\"\"identity\"\"\"\n    from scipy.sparse import eye\n    return eye(n)"),
+])
+def test_make_imports_lazy(source, source_expected):
+    tree = make_imports_lazy(ast.parse(source), lazy_modules=["scipy"])
+    assert ast.unparse(tree) == ast.unparse(ast.parse(source_expected))
+
+
+def test_make_imports_lazy_built_bot(tmp_path):
+    init_inputs, nb_turns, turns_inputs = TEST_INPUTS[0]
+    challenge_folder = ChallengeFolder(name="fall_challenge_2024", parent=ROOT_PATH / "bots")
+
+    outputs = []
+    for lazy_imports in [[], ["scipy"]]:
+        bot_path = tmp_path / f"bot_{len(lazy_imports)}.py"
+        bot_path.write_text(challenge_folder.aggregate_to_source(local_packages_paths=[ROOT_PATH / "botlibs"],
+                                                                 lazy_imports=lazy_imports))
+        completed = subprocess.run([sys.executable, bot_path], input="\n".join(init_inputs + turns_inputs),
+                                   capture_output=True, text=True)
+        assert completed.stdout.count("\n") == nb_turns
+        outputs.append(completed.stdout)
+
+    assert outputs[0] == outputs[1]
+    assert "from scipy" not in bot_path.read_text().split("\nclass ")[0]
+
+    # imports stay at the top of built files unless lazy imports are asked for
+    default_source = challenge_folder.aggregate_to_source(local_packages_paths=[ROOT_PATH / "botlibs"])
+    assert "from scipy" in default_source.split("\nclass ")[0]
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import pytest
+
+from builderlibs.packer import pack_source, decode_payload, encode_payload, PACK_FORMATS, SOURCE_FORMAT
+
+SOURCE = """from dataclasses import dataclass
+import sys
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+TABLE = [i * i for i in range(1000)]
+""" + "".join(f"""
+
+def function_{i}(table):
+    return [value + {i} for value in table if value % {i + 2} == 0]
+""" for i in range(50)) + """
+
+if __name__ == "__main__":
+    print(Point(1, 2), sum(TABLE), len(function_49(TABLE)), file=sys.stdout)
+"""
+
+
+def test_encode_decode_payload():
+    content = SOURCE.encode()
+    assert decode_payload(encode_payload(content)) == content
+
+
+@pytest.mark.parametrize("format", PACK_FORMATS)
+def test_pack_source(format, tmp_path):
+    packed_source = pack_source(SOURCE, format=format)
+    assert packed_source.source_size == len(SOURCE)
+    if format == SOURCE_FORMAT:
+        assert packed_source.source == SOURCE
+    else:
+        assert len(packed_source.source) < len(SOURCE)
+        assert packed_source.decode_duration > 0
+
+    bot_path = tmp_path / "bot.py"
+    bot_path.write_text(packed_source.source)
+    completed = subprocess.run([sys.executable, bot_path], capture_output=True, text=True, check=True)
+    assert completed.stdout == "Point(x=1, y=2) 332833500 20\n"
+
+
+def test_pack_source_default_format():
+    assert pack_source(SOURCE).source == SOURCE
+
+
+def test_pack_source_unknown_format():
+    with pytest.raises(ValueError):
+        pack_source(SOURCE, format="unknown")
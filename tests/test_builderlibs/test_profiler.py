@@ -0,0 +1,54 @@
+import ast
+import json
+import subprocess
+import sys
+
+import pytest
+
+from builderlibs.profiler import instrument_startup
+
+GAME_LOOP_SOURCE = """from __future__ import annotations
+import math
+
+
+class GameLoop:
+    __slots__ = ("width", "turns")
+
+    def __init__(self):
+        self.width = int(input())
+        self.turns = 0
+
+    def update_assets(self):
+        self.turns += int(input())
+
+    def start(self):
+        while True:
+            self.update_assets()
+            print(math.sqrt(self.width * self.turns))
+
+
+GameLoop().start()
+"""
+
+MODULE_LOOP_SOURCE = """import math
+WIDTH = int(input())
+while True:
+    print(math.sqrt(WIDTH * int(input())))
+"""
+
+
+@pytest.mark.parametrize("source, inputs, phases_expected", [
+    (GAME_LOOP_SOURCE, "4\n1\n3\n", ["imports_ms", "definitions_ms", "init_ms", "first_turn_ms", "total_ms"]),
+    (MODULE_LOOP_SOURCE, "4\n1\n4\n", ["imports_ms", "definitions_ms", "total_ms"])
+])
+def test_instrument_startup(source, inputs, phases_expected, tmp_path):
+    bot_path = tmp_path / "bot.py"
+    bot_path.write_text(ast.unparse(instrument_startup(ast.parse(source))))
+
+    completed = subprocess.run([sys.executable, bot_path], input=inputs, capture_output=True, text=True)
+
+    assert completed.stdout.split() == ["2.0", "4.0"]
+    reports = [json.loads(line) for line in completed.stderr.splitlines() if line.startswith("{")]
+    assert len(reports) == 1
+    assert list(reports[0]["startup"].keys()) == phases_expected
+    assert all(duration >= 0 for duration in reports[0]["startup"].values())